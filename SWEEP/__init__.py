@@ -7,10 +7,17 @@ NFL game visualization package
 from .sweep_main import (
     get_visualization,
     run_sweep_viz,
-    make_sweep_data
+    make_sweep_data,
+    make_sweep_season,
+    render_games,
+    cached_sweep_data,
+    sweep_data_cache_info,
+    clear_sweep_data_cache,
+    SWEEP_PIPELINE_VERSION
 )
 
 from .sweep_viz import (
+    build_render_context,
     create_viz,
     viz_probability,
     add_team_traces,
@@ -26,25 +33,82 @@ from .sweep_viz import (
     add_exciting_table
 )
 
+from .sweep_figure import (
+    FigureSpec,
+    compact_figure,
+    write_figure,
+    write_plotlyjs,
+    payload_report,
+    PAYLOAD_DECIMALS
+)
+
 from .sweep_data import (
     download_nfl_data_season,
     get_game_info,
+    build_game_catalog,
+    game_catalog,
+    find_games,
+    get_catalog_game,
     filter_non_plays,
+    is_admin_event,
+    flag_admin_events,
+    ADMIN_EVENT_STRINGS,
+    shift_in_game,
+    game_row_groups,
+    shifted_positions,
+    filled_positions,
+    take_rows,
     calculate_time_elapsed,
+    compute_time_elapsed,
     calculate_field_position_home_perspective,
+    add_home_perspective,
+    home_perspective_wp,
     enhance_time_and_field,
     categorize_play,
     identify_special_outcome,
     categorize_game_data,
+    categorize_plays,
+    identify_special_outcomes,
+    PLAY_CATEGORIES,
+    SPECIAL_OUTCOMES,
     label_drives_firsts,
     calculate_excitement,
+    game_summary,
+    add_drive_segments,
+    build_drive_table,
+    DRIVE_SEGMENT_COLUMNS,
+    DRIVE_TABLE_COLUMNS,
     create_hover_text,
+    build_hover_text,
+    hover_rows,
+    create_hover_data,
+    hover_template,
+    HOVER_DATA_COLUMNS,
     create_final_display_data
 )
 
+from .sweep_store import (
+    materialize_season,
+    stored_sweep_viz,
+    load_enriched_game,
+    save_enriched_game,
+    read_enriched_game_meta,
+    STORE_COLUMNS,
+    SWEEP_STORE_DIR
+)
+
 from .sweep_download import (
     download_nfl_data_season,
-    view_games
+    download_nfl_data_seasons,
+    make_session,
+    view_games,
+    load_cached_season,
+    save_cached_season,
+    season_cache_entries,
+    evict_season_cache,
+    clear_season_cache,
+    SWEEP_SCHEMA,
+    apply_sweep_schema
 )
 
 # Define what gets imported with "from sweep import *"
@@ -1,6 +1,8 @@
 import nfl_data_py as nfl
 import pandas as pd
 import numpy as np
+import weakref
+import re
 
 def download_nfl_data_season(season=2025):
     """Download NFL data using requests library"""
@@ -57,16 +59,181 @@ def get_game_info(game_plays,print = False):
     return home_team,away_team,game_date,season_type,is_playoff,ot_period_length
 
 
-def filter_non_plays(game_plays,exclude_strings = ['imeout','END QUARTER','END GAME']):
-    for string in exclude_strings:
-        game_plays= game_plays[np.where(game_plays['desc'].str.contains(string),False,True)]
-    return(game_plays)
+### Season-level game catalog: one row per game plus the range of its plays in game_id order
+PLAYOFF_SEASON_TYPES = ['POST', 'WC', 'DIV', 'CON', 'SB']
+_GAME_CATALOGS = {}
+
+def build_game_catalog(season_data):
+    """
+    Build a catalog with one row per game_id (teams, week, date, season type, OT length, final score)
+    and the [start, stop) range of that game's plays in the stable game_id order of season_data.
+    That order is kept in catalog.attrs['row_order'] when the rows are not grouped by game_id.
+    """
+    order, first, last = game_row_groups(season_data)
+    codes, game_ids = pd.factorize(season_data['game_id'], sort=False)
+    starts = np.flatnonzero(first)
+    stops = np.flatnonzero(last) + 1
+
+    first_rows = season_data.iloc[order[starts]]
+    catalog = pd.DataFrame({'game_id': np.asarray(game_ids, dtype=object)})
+    for col in ['season', 'week', 'home_team', 'away_team', 'game_date', 'season_type', 'home_score', 'away_score']:
+        if col in season_data.columns:
+            catalog[col] = first_rows[col].to_numpy()
+    if 'season_type' not in catalog.columns:
+        catalog['season_type'] = 'REG'
+    catalog['is_playoff'] = catalog['season_type'].isin(PLAYOFF_SEASON_TYPES).to_numpy()
+
+    # OT length from the clock of each game's first (largest remaining) Q5 play, rounded to the
+    # minute (~600 or ~900), falling back to the season type default
+    catalog['ot_len'] = np.where(catalog['is_playoff'], 900, 600)
+    is_ot = (season_data['qtr'] == 5).fillna(False).to_numpy()
+    ot_remaining = season_data['quarter_seconds_remaining'].to_numpy(dtype=float, na_value=np.nan)[is_ot]
+    ot_remaining = pd.Series(ot_remaining).groupby(codes[is_ot]).max().dropna()
+    catalog.loc[ot_remaining.index, 'ot_len'] = (np.round(ot_remaining.to_numpy() / 60) * 60).astype(int)
+
+    catalog['start'] = starts
+    catalog['stop'] = stops
+    catalog = catalog.set_index('game_id')
+    if not np.array_equal(order, np.arange(len(order))):
+        catalog.attrs['row_order'] = order
+    return catalog
+
+def game_catalog(season_data):
+    """Return the game catalog for a loaded season, building it once per season frame"""
+    key = id(season_data)
+    entry = _GAME_CATALOGS.get(key)
+    if entry is not None and entry[0]() is season_data and entry[1] == len(season_data):
+        return entry[2]
+    catalog = build_game_catalog(season_data)
+    _GAME_CATALOGS[key] = (weakref.ref(season_data, lambda ref: _GAME_CATALOGS.pop(key, None)), len(season_data), catalog)
+    return catalog
 
-def calculate_time_elapsed(row,ot_length = 10):
+def find_games(catalog, week=None, team=None):
+    """Catalog rows matching a week and/or a team playing home or away"""
+    games = catalog
+    if week is not None:
+        games = games[games['week'] == week]
+    if team is not None:
+        games = games[(games['home_team'] == team) | (games['away_team'] == team)]
+    return games
+
+def get_catalog_game(season_data, game_id, catalog=None):
+    """
+    One game's plays (a zero-copy slice when the season rows are grouped by game_id) plus its
+    game info tuple (as returned by get_game_info)
+    """
+    catalog = game_catalog(season_data) if catalog is None else catalog
+    game = catalog.loc[game_id]
+    rows = slice(game['start'], game['stop'])
+    if 'row_order' in catalog.attrs:
+        rows = catalog.attrs['row_order'][rows]
+    game_plays = season_data.iloc[rows]
+    game_info = (game['home_team'], game['away_team'], game['game_date'], game['season_type'],
+                 bool(game['is_playoff']), int(game['ot_len']))
+    return game_plays, game_info
+
+
+### Game-aware shifts and fills. A frame may hold one game or a whole season, so values
+### are shifted/filled within each game_id and never leak across game boundaries.
+def game_row_groups(game_plays):
+    """
+    Row layout for the in-game position helpers below, computed once per frame:
+    (order, first, last) with order the stable sort of rows by game_id (the identity when
+    games are contiguous) and first / last flagging each game's first / last row in that order.
+    """
+    n = len(game_plays)
+    if 'game_id' in game_plays.columns:
+        codes = pd.factorize(game_plays['game_id'])[0]
+        order = np.argsort(codes, kind='stable')
+        codes = codes[order]
+    else:
+        order = np.arange(n)
+        codes = np.zeros(n, dtype=int)
+    boundary = codes[1:] != codes[:-1]
+    first = np.concatenate([np.ones(min(n, 1), dtype=bool), boundary])
+    last = np.concatenate([boundary, np.ones(min(n, 1), dtype=bool)])
+    return order, first, last
+
+def in_frame_positions(groups, sorted_positions):
+    """Map source positions found in game order back to frame row positions (-1 stays -1)"""
+    order = groups[0]
+    positions = np.full(len(order), -1)
+    positions[order] = np.where(sorted_positions >= 0, order[np.maximum(sorted_positions, 0)], -1)
+    return positions
+
+def shifted_positions(groups, periods=1):
+    """Row position of the play periods rows earlier (later when negative) in the same game, -1 outside the game"""
+    order, first, last = groups
+    n = len(order)
+    game = np.cumsum(first) - 1
+    source = np.arange(n) - periods
+    inside = (source >= 0) & (source < n)
+    inside[inside] &= game[source[inside]] == game[inside]
+    return in_frame_positions(groups, np.where(inside, source, -1))
+
+def filled_positions(groups, valid, method='ffill'):
+    """Row position of the nearest valid play at or before (ffill) / after (bfill) each play in its game, -1 if none"""
+    order, first, last = groups
+    n = len(order)
+    rows = np.arange(n)
+    valid = np.asarray(valid, dtype=bool)[order]
+    if method == 'ffill':
+        source = np.maximum.accumulate(np.where(valid, rows, -1)) if n else rows
+        game_start = np.maximum.accumulate(np.where(first, rows, 0)) if n else rows
+        source = np.where(source >= game_start, source, -1)
+    else:
+        source = np.minimum.accumulate(np.where(valid, rows, n)[::-1])[::-1] if n else rows
+        game_end = np.minimum.accumulate(np.where(last, rows, n)[::-1])[::-1] if n else rows
+        source = np.where(source <= game_end, source, -1)
+    return in_frame_positions(groups, source)
+
+def take_rows(values, positions):
+    """values (a Series) taken at row positions, missing where the position is -1; keeps the dtype"""
+    taken = pd.api.extensions.take(values.array, positions, allow_fill=True)
+    return pd.Series(taken, index=values.index, name=values.name)
+
+def shift_in_game(game_plays,values,periods=1):
+    """values.shift(periods) within each game of game_plays (one-off shifts; reuse game_row_groups for several)"""
+    return take_rows(values,shifted_positions(game_row_groups(game_plays),periods))
+
+
+# desc patterns of administrative events (timeouts, period ends) that are not plays
+ADMIN_EVENT_STRINGS = ['imeout','END QUARTER','END GAME']
+_ADMIN_EVENT_PATTERNS = {}
+
+def admin_event_pattern(exclude_strings=ADMIN_EVENT_STRINGS):
+    """exclude_strings as one compiled regex alternation (compiled once per list)"""
+    key = tuple(exclude_strings)
+    if key not in _ADMIN_EVENT_PATTERNS:
+        _ADMIN_EVENT_PATTERNS[key] = re.compile('|'.join(f'(?:{string})' for string in key))
+    return _ADMIN_EVENT_PATTERNS[key]
+
+def is_admin_event(game_plays,exclude_strings=ADMIN_EVENT_STRINGS):
+    """
+    Plays whose desc matches any of exclude_strings, in a single regex pass over desc.
+    Plays without a desc count as admin events, as the per-string filter dropped them too.
+    """
+    admin = game_plays['desc'].astype(object).str.contains(admin_event_pattern(exclude_strings), na=True)
+    return admin.astype(bool)
+
+def flag_admin_events(pbp,exclude_strings=ADMIN_EVENT_STRINGS):
+    """Add the 'is_admin_event' column filter_non_plays reuses (done once, when a season is loaded)"""
+    pbp['is_admin_event'] = is_admin_event(pbp,exclude_strings).to_numpy()
+    return pbp
+
+def filter_non_plays(game_plays,exclude_strings = ADMIN_EVENT_STRINGS):
+    """Drop timeouts / period ends with one mask, using the load-time 'is_admin_event' flag when present"""
+    if 'is_admin_event' in game_plays.columns and list(exclude_strings) == ADMIN_EVENT_STRINGS:
+        admin = game_plays['is_admin_event'].to_numpy(dtype=bool)
+    else:
+        admin = is_admin_event(game_plays,exclude_strings).to_numpy()
+    return(game_plays[~admin])
+
+def calculate_time_elapsed(row,ot_length = 600):
     """
     Convert game situation to total seconds elapsed.
     Uses game_seconds_remaining when available to handle both regular season (10 min OT) 
-    and playoff (15 min OT) correctly.
+    and playoff (15 min OT) correctly. ot_length is the OT period length in seconds (600 or 900).
     """
     qtr = row['qtr']
     if pd.isna(qtr):
@@ -102,7 +269,8 @@ def calculate_time_elapsed(row,ot_length = 10):
             # We'll estimate based on the data: if quarter_seconds_remaining > 600, assume 15 min (playoffs)
             # Otherwise assume 10 min (regular season)
             ot_period = qtr - 5  # 0 for Q5, 1 for Q6, etc.
-            if ot_length==10:
+            # OT length in seconds (600 / 900, as get_game_info returns it) or minutes (10 / 15)
+            if ot_length in (10, 600):
                 elapsed_OT = 600 -qtr_seconds_remaining
                 elapsed = 3600 + (ot_period * 600) + elapsed_OT
             else:
@@ -125,6 +293,45 @@ def calculate_time_elapsed(row,ot_length = 10):
     return np.nan
 
 
+def compute_time_elapsed(game_plays,ot_length = 600):
+    """
+    Vectorized calculate_time_elapsed: total seconds elapsed for every play at once.
+    Gives the same values as the row-wise function, branch for branch. ot_length is the OT
+    period length in seconds (600 or 900; 10 / 15 minutes also accepted), a scalar or a per-row
+    array (e.g. each game's OT length when game_plays spans a whole season).
+    """
+    def column(name):
+        if name not in game_plays.columns:
+            return np.full(len(game_plays), np.nan)
+        return game_plays[name].to_numpy(dtype=float, na_value=np.nan)
+
+    qtr = column('qtr')
+    game_seconds_remaining = column('game_seconds_remaining')
+    qtr_seconds_remaining = column('quarter_seconds_remaining')
+    ot_length = np.broadcast_to(np.asarray(ot_length), qtr.shape)
+
+    regulation = qtr <= 4
+    ot_period = qtr - 5  # 0 for Q5, 1 for Q6, etc.
+    ot_period_length = np.where((ot_length == 10) | (ot_length == 600), 600, 900)
+
+    # Primary method: game_seconds_remaining, only trusted in regulation
+    from_game_clock = regulation & (game_seconds_remaining >= 0) & (game_seconds_remaining <= 3600)
+    # Fallback: quarter and quarter_seconds_remaining
+    from_qtr_clock = ~from_game_clock & ~np.isnan(qtr_seconds_remaining)
+
+    return np.select(
+        [np.isnan(qtr),
+         from_game_clock,
+         from_qtr_clock & regulation,
+         from_qtr_clock],
+        [np.nan,
+         3600 - game_seconds_remaining,
+         (qtr - 1) * 900 + (900 - qtr_seconds_remaining),
+         3600 + ot_period * ot_period_length + (ot_period_length - qtr_seconds_remaining)],
+        # Last resort: start of the quarter (10 min OT assumed)
+        default=np.where(regulation, (qtr - 1) * 900, 3600 + ot_period * 600)
+    )
+
 def calculate_field_position_home_perspective(row,home_team):
     """
     Convert field position to home team perspective.
@@ -151,14 +358,46 @@ def calculate_field_position_home_perspective(row,home_team):
     
 #game_plays['field_position'] = game_plays.apply(calculate_field_position_home_perspective, axis=1)
 
+### Vectorized home-perspective transforms, used for whole columns (a game or a full season)
+HOME_WP_COLUMNS = {'vegas_wp': 'home_vegas_wp', 'wp': 'home_model_wp'}
+
+def is_home_possession(posteam,home_team):
+    """Boolean array: True where posteam is the home team. home_team is a scalar or per-row array"""
+    posteam = np.asarray(posteam, dtype=object)
+    return posteam == np.asarray(home_team, dtype=object)
+
+def home_perspective_wp(wp,posteam,home_team):
+    """Flip possession-team win probability to the home team's perspective (NaN stays NaN)"""
+    wp = np.asarray(wp, dtype=float)
+    return np.where(is_home_possession(posteam,home_team), wp, 1 - wp)
+
+def add_home_perspective(game_plays,home_team):
+    """
+    Add the home-perspective columns the excitement and viz steps read:
+    field_position (vectorized calculate_field_position_home_perspective) and
+    home_vegas_wp / home_model_wp for each of vegas_wp / wp present (NaN where posteam is unknown).
+    """
+    posteam = game_plays['posteam'].to_numpy(dtype=object)
+    home_has_ball = is_home_possession(posteam,home_team)
+
+    yardline_100 = game_plays['yardline_100'].to_numpy(dtype=float, na_value=np.nan)
+    game_plays['field_position'] = np.where(home_has_ball, 50 - yardline_100, yardline_100 - 50)
+
+    has_posteam = game_plays['posteam'].notna().to_numpy()
+    for wp_col, home_col in HOME_WP_COLUMNS.items():
+        if wp_col in game_plays.columns:
+            home_wp = home_perspective_wp(game_plays[wp_col].to_numpy(dtype=float, na_value=np.nan),posteam,home_team)
+            game_plays[home_col] = np.where(has_posteam, home_wp, np.nan)
+    return game_plays
+
 def enhance_time_and_field(game_plays,ot_length,home_team):
     #Create elapsed time metrics 
-    game_plays['time_elapsed'] = game_plays.apply(calculate_time_elapsed, args=([ot_length]),axis=1)
+    game_plays['time_elapsed'] = compute_time_elapsed(game_plays,ot_length)
     game_plays['time_elapsed_min'] = game_plays['time_elapsed'] / 60
-    game_plays['next_time_elapsed_min'] = game_plays['time_elapsed_min'].shift(-1)
+    game_plays['next_time_elapsed_min'] = shift_in_game(game_plays,game_plays['time_elapsed_min'],-1)
 
-    #Normalize field position
-    game_plays['field_position'] = game_plays.apply(calculate_field_position_home_perspective,axis=1,home_team=home_team)
+    #Normalize field position and win probability to the home team's perspective
+    game_plays = add_home_perspective(game_plays,home_team)
 
     #get score margin:
     game_plays['score_margin'] = game_plays['total_home_score'] - game_plays['total_away_score']
@@ -169,7 +408,6 @@ def enhance_time_and_field(game_plays,ot_length,home_team):
 def categorize_play(row):
     """Categorize play type"""
     play_type = row.get('play_type', '')
-    desc = str(row.get('desc', '')).lower()
     penalty = row.get('penalty', 0)
     
     # If there's a penalty, categorize as penalty
@@ -190,7 +428,6 @@ def categorize_play(row):
 
 def identify_special_outcome(row):
     """Identify special play outcomes"""
-    desc = str(row.get('desc', '')).lower()
     
     # Check for touchdowns
     if row.get('touchdown') == 1:
@@ -220,100 +457,143 @@ def identify_special_outcome(row):
 
 
     
+### Vectorized play categorization. Categories are fixed so codes are stable across games and seasons.
+# Categories drawn as drive lines / markers
+DRIVE_PLAY_CATEGORIES = ['run', 'pass', 'punt', 'penalty']
+PLAY_CATEGORIES = pd.CategoricalDtype(['run', 'pass', 'penalty', 'punt', 'field_goal', 'kickoff', 'other'])
+SPECIAL_OUTCOMES = pd.CategoricalDtype(['touchdown', 'field_goal_made', 'field_goal_missed',
+                                        'interception', 'fumble_lost', 'punt', 'turnover_on_downs'])
+
+def column_equals(game_plays,col,value):
+    """Boolean array for game_plays[col] == value; all False if the column is missing"""
+    if col not in game_plays.columns:
+        return np.zeros(len(game_plays), dtype=bool)
+    return (game_plays[col] == value).fillna(False).to_numpy(dtype=bool)
+
+def categorize_plays(game_plays):
+    """Vectorized categorize_play: play_category for every row as a PLAY_CATEGORIES categorical"""
+    play_type = game_plays['play_type'].astype('category') if 'play_type' in game_plays.columns \
+        else pd.Series(pd.Categorical([np.nan] * len(game_plays)), index=game_plays.index)
+    # Kickoff test runs once per distinct play_type rather than once per play
+    kickoff_types = play_type.cat.categories.astype(str).str.lower().str.contains('kickoff')
+    is_kickoff = np.r_[np.asarray(kickoff_types, dtype=bool), False][play_type.cat.codes.to_numpy()]
+
+    categories = list(PLAY_CATEGORIES.categories)
+    codes = np.select(
+        [column_equals(game_plays,'penalty',1),
+         column_equals(game_plays,'play_type','run'),
+         column_equals(game_plays,'play_type','pass'),
+         column_equals(game_plays,'play_type','punt'),
+         column_equals(game_plays,'play_type','field_goal'),
+         is_kickoff],
+        [categories.index(category) for category in ['penalty', 'run', 'pass', 'punt', 'field_goal', 'kickoff']],
+        default=categories.index('other'))
+    return pd.Series(pd.Categorical.from_codes(codes, dtype=PLAY_CATEGORIES), index=game_plays.index)
+
+def identify_special_outcomes(game_plays):
+    """Vectorized identify_special_outcome: special_outcome as a SPECIAL_OUTCOMES categorical (NaN for none)"""
+    categories = list(SPECIAL_OUTCOMES.categories)
+    codes = np.select(
+        [column_equals(game_plays,'touchdown',1),
+         column_equals(game_plays,'field_goal_result','made'),
+         column_equals(game_plays,'field_goal_result','missed'),
+         column_equals(game_plays,'interception',1),
+         column_equals(game_plays,'fumble_lost',1),
+         column_equals(game_plays,'punt_attempt',1),
+         column_equals(game_plays,'fourth_down_failed',1)],
+        [categories.index(outcome) for outcome in ['touchdown', 'field_goal_made', 'field_goal_missed',
+                                                   'interception', 'fumble_lost', 'punt', 'turnover_on_downs']],
+        default=-1)
+    return pd.Series(pd.Categorical.from_codes(codes, dtype=SPECIAL_OUTCOMES), index=game_plays.index)
+
 def categorize_game_data(game_plays):
 
-    game_plays['play_category'] = game_plays.apply(categorize_play, axis=1)
-    game_plays['special_outcome'] = game_plays.apply(identify_special_outcome, axis=1)
+    game_plays['play_category'] = categorize_plays(game_plays)
+    game_plays['special_outcome'] = identify_special_outcomes(game_plays)
 
     return game_plays
 
 
 
 def label_drives_firsts(game_plays):
-    game_plays = game_plays.reset_index()
+    """
+    Adds 'is_drive_start' (first play with a down of each drive) and 'is_first_down'
+    (1st & 10 plays that follow a conversion) from row-aligned masks; works on one game
+    or a whole season frame (shifts stay within each game_id).
+    """
     game_plays['down']= game_plays['down'].fillna(0)
     
-    # Identify drive start plays (first play of each drive)
-    drive_plays = game_plays[game_plays['down']>0]
-    
-    drive_plays['is_drive_start'] = drive_plays['drive'] != drive_plays['drive'].shift(1)
-    drive_plays_ = drive_plays[['is_drive_start','index']]
-
-    game_plays=game_plays.merge(drive_plays_,on='index',how='left')
-    #game_plays_['is_drive_start'].fillna(False)
+    # Identify drive start plays (first play of each drive), comparing each play with a down
+    # to the previous play with a down in the same game
+    has_down = (game_plays['down']>0).to_numpy()
+    down_plays = game_plays.loc[has_down, game_plays.columns.intersection(['game_id','drive'])]
+    is_drive_start = np.zeros(len(game_plays), dtype=bool)
+    is_drive_start[has_down] = (down_plays['drive'] != shift_in_game(down_plays,down_plays['drive'],1)).to_numpy()
+    game_plays['is_drive_start'] = is_drive_start
     
     # Identify first down conversions - check multiple possible column names
     # We want to mark the FIRST down play, not the play that earned it
     if 'first_down' in game_plays.columns:
         # Mark plays where the PREVIOUS play converted
-        first_down_converted = (game_plays['first_down'].shift(1) == 1) & (game_plays['play_type'].isin(['pass', 'run']))
+        first_down_converted = (shift_in_game(game_plays,game_plays['first_down'],1) == 1) & (game_plays['play_type'].isin(['pass', 'run']))
         # Or if this is a 1st down play (down == 1) after a conversion
         game_plays['is_first_down'] = (game_plays['down'] == 1) & first_down_converted
     elif 'first_down_pass' in game_plays.columns or 'first_down_rush' in game_plays.columns:
-        first_down_converted = (
-            (game_plays.get('first_down_pass', 0).shift(1) == 1) | 
-            (game_plays.get('first_down_rush', 0).shift(1) == 1)
-        )
-        game_plays_['is_first_down'] = (game_plays_['down'] == 1) & first_down_converted
+        first_down_converted = pd.Series(False, index=game_plays.index)
+        for col in ['first_down_pass', 'first_down_rush']:
+            if col in game_plays.columns:
+                first_down_converted |= shift_in_game(game_plays,game_plays[col],1) == 1
+        game_plays['is_first_down'] = (game_plays['down'] == 1) & first_down_converted
     else:
         # Check if this is a 1st down play following a conversion
+        previous_down = shift_in_game(game_plays,game_plays['down'],1)
         game_plays['is_first_down'] = (
             (game_plays['down'] == 1) & 
-            (game_plays['down'].shift(1).notna()) & 
-            (game_plays['down'].shift(1) != 1) &
-            (game_plays['drive'] == game_plays['drive'].shift(1))  # Same drive
+            (previous_down.notna()) & 
+            (previous_down != 1) &
+            (game_plays['drive'] == shift_in_game(game_plays,game_plays['drive'],1))  # Same drive
         )
 
     return game_plays
 
 
 def calculate_excitement(game_plays,home_team):
-    
+    """
+    Adds home_wp, home_wp_next, play_excitement, possession_changed, is_real_play and
+    play_unpredictability. Every shift and fill stays within a game (positions from
+    game_row_groups, computed once), so one call covers a single game or whole seasons;
+    home_team may be one team or a per-row array.
+    """
     # Calculate play excitement (change in win probability percentage)
     # excitement = |WP_after - WP_before| * 100 (as percentage points)
     # Use vegas_wp or wp column
     wp_col = 'vegas_wp' if 'vegas_wp' in game_plays.columns else 'wp'
     
     if wp_col in game_plays.columns:
-        # Check if WP is in 0-1 or 0-100 scale
-        max_wp = game_plays[wp_col].max()
-        wp_scale = 1 if max_wp <= 1 else 100
+        groups = game_row_groups(game_plays)
+        next_play = shifted_positions(groups,-1)
+        previous_play = shifted_positions(groups,1)
         
         # Forward fill WP values to handle timeouts, penalties, END QUARTER, etc.
         # These administrative plays shouldn't have their own WP, they inherit from previous play
         # Replace 0s and NaNs, then forward fill
-        game_plays[wp_col + '_filled'] = game_plays[wp_col].replace(0, np.nan).ffill()#.bfill()  # bfill for first play
+        wp = game_plays[wp_col].replace(0, np.nan)
+        game_plays[wp_col + '_filled'] = take_rows(wp,filled_positions(groups,wp.notna()))
         
         # ALSO forward-fill posteam for administrative plays (timeouts, END QUARTER, etc.)
         # This ensures we use the correct team perspective when converting WP
-        game_plays['posteam_filled'] = game_plays['posteam'].ffill().bfill()  # bfill for first play
+        posteam_ffill = filled_positions(groups,game_plays['posteam'].notna())
+        posteam_bfill = filled_positions(groups,posteam_ffill >= 0,'bfill')  # bfill for first play
+        posteam_filled = np.where(posteam_bfill >= 0, posteam_ffill[np.maximum(posteam_bfill, 0)], -1)
+        game_plays['posteam_filled'] = take_rows(game_plays['posteam'],posteam_filled)
         
         # Convert WP to home team perspective for EVERY row
         # If home team has possession, WP is already from home perspective
         # If away team has possession, WP is from away perspective, so flip it
         # NOTE: The WP in the data represents win probability AT THE START of the play
-        
-    
-        game_plays['home_wp'] = game_plays.apply(
-            lambda row: (row[wp_col + '_filled'] if row['posteam_filled'] == home_team 
-                         else 1 - row[wp_col + '_filled']) if pd.notna(row[wp_col + '_filled']) 
-                         else np.nan,
-            axis=1
-        )
-        
-        # Calculate excitement as absolute change in home WP from this play to next
-        # Shift home_wp backward by 1 to get next play's home_wp
-        game_plays['home_wp_next'] = game_plays['home_wp'].shift(-1)
-        game_plays['posteam_filled_next'] = game_plays['posteam_filled'].shift(-1)
-    
-        '''
-        game_plays['home_wp_next'] = game_plays.apply(
-            lambda row: row['home_wp_next_'] if row['posteam_filled']==row['posteam_filled_next']
-                else 1 - row['home_wp_next_'],
-            axis=1
-        )
-        '''
-    
+        home_wp = home_perspective_wp(game_plays[wp_col + '_filled'].to_numpy(dtype=float, na_value=np.nan),
+                                      game_plays['posteam_filled'],home_team)
+        game_plays['home_wp'] = home_wp
         
         # Calculate excitement as absolute change in home WP from this play to next
         # The WP value represents the win probability AT THE START of a play
@@ -322,22 +602,23 @@ def calculate_excitement(game_plays,home_team):
         # WP_before_play = the WP at the start of THIS play
         
         # Get next play's WP (represents state AFTER current play completes)
-        game_plays['home_wp_next'] = game_plays['home_wp'].shift(-1)
+        home_wp_next = np.where(next_play >= 0, home_wp[np.maximum(next_play, 0)], np.nan)
+        game_plays['home_wp_next'] = home_wp_next
+        game_plays['posteam_filled_next'] = take_rows(game_plays['posteam_filled'],next_play)
         
         # Excitement = |WP_after - WP_before| = impact of THIS play
-        game_plays['play_excitement'] = abs(game_plays['home_wp_next'] - game_plays['home_wp']) * 100
-            
         # Special handling for last play of half/game where there is no "next play"
         # For these plays, excitement should be 0 since we can't measure the change
-        game_plays['play_excitement'] = game_plays['play_excitement'].fillna(0)
+        play_excitement = np.nan_to_num(np.abs(home_wp_next - home_wp) * 100, nan=0.0)
         
         # Also set excitement to 0 for plays at end of quarters where next play is a kickoff
         # (the WP reset makes the "excitement" artificially high)
-        next_play_is_kickoff = game_plays['play_type'].shift(-1) == 'kickoff'
-        game_plays.loc[next_play_is_kickoff, 'play_excitement'] = 0
+        next_play_is_kickoff = (take_rows(game_plays['play_type'],next_play) == 'kickoff').to_numpy()
+        play_excitement[next_play_is_kickoff] = 0
+        game_plays['play_excitement'] = play_excitement
         
         # Add diagnostic: check if possession changed
-        game_plays['possession_changed'] = game_plays['posteam'] != game_plays['posteam'].shift(1)
+        game_plays['possession_changed'] = game_plays['posteam'] != take_rows(game_plays['posteam'],previous_play)
         
         # Only calculate excitement for actual plays
         # Include: pass, run, punt, field_goal (without penalties)
@@ -350,21 +631,223 @@ def calculate_excitement(game_plays,home_team):
         # Set excitement to 0 for non-real plays (timeouts, 2-min warnings, etc.)
         game_plays.loc[~game_plays['is_real_play'], 'play_excitement'] = 0
 
-        game_plays['play_unpredictability'] = abs(0.5 - game_plays['home_wp'])
-        
-        # Game-level metrics (only real plays)
-        #real_plays = game_plays[game_plays['is_real_play']]
-        #avg_excitement = real_plays['play_excitement'].mean()
-        #avg_unpredictability = real_plays['play_unpredictability'].mean()
+        game_plays['play_unpredictability'] = np.abs(0.5 - home_wp)
     else:
         game_plays['play_excitement'] = 0
         game_plays['play_unpredictability'] = 0
         game_plays['is_real_play'] = True
-        #avg_excitement = 0
-        #avg_unpredictability = 0
         
     return game_plays
 
+# Per-team columns of game_summary, each prefixed home_ / away_
+TEAM_SUMMARY_STATS = ['tds', 'fgs', 'drives', 'plays', 'pass_yards', 'rush_yards', 'penalty_yards', 'ppd']
+
+def game_summary(game_plays):
+    """
+    Game summary behind add_game_table, one row per game (indexed by game_id when present):
+    final scores, TD / FG counts, lead changes and ties (score-margin sign changes),
+    drives, plays, pass / rush / penalty yards and points per drive for each team (home_ / away_),
+    and average excitement / unpredictability over real plays.
+    Works on one game or a season frame; shifts stay within each game.
+    """
+    groups = game_row_groups(game_plays)
+    order, first, last = groups
+    n_games = int(first.sum())
+    game = np.empty(len(game_plays), dtype=int)
+    game[order] = np.cumsum(first) - 1
+    first_rows = order[first]
+    last_rows = order[last]
+
+    def values(column, dtype=float):
+        return game_plays[column].to_numpy(dtype=dtype, na_value=np.nan if dtype == float else None)
+
+    def per_game(weights):
+        return np.bincount(game, weights=weights, minlength=n_games)
+
+    home_team = values('home_team', object)
+    away_team = values('away_team', object)
+    posteam = values('posteam', object)
+    side = np.select([posteam == home_team, posteam == away_team], ['home', 'away'], None)
+
+    # Leader after each play: +1 home, -1 away, 0 tied (or unknown); changes counted within a game
+    leader = np.sign(np.nan_to_num(values('score_margin')))
+    previous_play = shifted_positions(groups,1)
+    previous_leader = np.where(previous_play >= 0, leader[np.maximum(previous_play, 0)], 0)
+    lead_changes = per_game(leader * previous_leader == -1)
+    ties = per_game((leader == 0) & (previous_leader != 0))
+
+    # One groupby over (game, side) for every per-team count and sum
+    play_type = values('play_type', object)
+    is_pass = play_type == 'pass'
+    is_run = play_type == 'run'
+    special_outcome = values('special_outcome', object)
+    yards = values('yards_gained')
+    team_rows = pd.DataFrame({
+        'game': game,
+        'side': side,
+        'tds': special_outcome == 'touchdown',
+        'fgs': special_outcome == 'field_goal_made',
+        'drives': np.where(is_pass | is_run, values('drive'), np.nan),
+        'plays': np.where(is_pass | is_run, values('play_id'), np.nan),
+        'pass_yards': np.where(is_pass, yards, np.nan),
+        'rush_yards': np.where(is_run, yards, np.nan),
+        'penalty_yards': np.where(values('penalty') == 1, values('penalty_yards'), np.nan),
+    })
+    team_stats = team_rows.groupby(['game', 'side']).agg(
+        tds=('tds', 'sum'), fgs=('fgs', 'sum'), drives=('drives', 'nunique'), plays=('plays', 'count'),
+        pass_yards=('pass_yards', 'sum'), rush_yards=('rush_yards', 'sum'), penalty_yards=('penalty_yards', 'sum'))
+    team_stats = team_stats.unstack('side').reindex(
+        index=range(n_games), columns=pd.MultiIndex.from_product([team_stats.columns, ['home', 'away']]), fill_value=0)
+
+    real_play = values('is_real_play', object).astype(bool)
+    def real_play_mean(column):
+        column_values = values(column)
+        counted = real_play & ~np.isnan(column_values)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return per_game(np.where(counted, column_values, 0)) / per_game(counted)
+
+    summary = pd.DataFrame({
+        'home_team': home_team[first_rows],
+        'away_team': away_team[first_rows],
+        'final_home_score': values('total_home_score')[last_rows],
+        'final_away_score': values('total_away_score')[last_rows],
+        'lead_changes': lead_changes.astype(int),
+        'ties': ties.astype(int),
+    })
+    for team in ['home', 'away']:
+        for stat in TEAM_SUMMARY_STATS[:-1]:
+            summary[f'{team}_{stat}'] = team_stats[(stat, team)].to_numpy()
+        drives = summary[f'{team}_drives'].to_numpy()
+        with np.errstate(invalid='ignore', divide='ignore'):
+            summary[f'{team}_ppd'] = np.where(drives > 0, summary[f'final_{team}_score'] / drives, 0)
+    summary['avg_excitement'] = real_play_mean('play_excitement')
+    summary['avg_unpredictability'] = real_play_mean('play_unpredictability')
+    if 'game_id' in game_plays.columns:
+        summary.index = pd.Index(values('game_id', object)[first_rows], name='game_id')
+    return summary
+
+### Drive-level data: per-play segment endpoints and one row per drive, for a game or a whole season
+# Per-play columns added by add_drive_segments
+DRIVE_SEGMENT_COLUMNS = ['segment_x0', 'segment_x1', 'segment_y0', 'segment_y1', 'has_segment']
+# Columns of build_drive_table, in order
+DRIVE_TABLE_COLUMNS = ['game_id', 'drive', 'team', 'start_time', 'end_time', 'start_field_position',
+                       'end_field_position', 'plays', 'yards', 'result', 'points', 'duration']
+
+def drive_play_mask(game_plays):
+    """Plays drawn on drive lines: a down, a field position and a DRIVE_PLAY_CATEGORIES category"""
+    return ((game_plays['down'] > 0) & game_plays['drive'].notna() & game_plays['field_position'].notna() &
+            game_plays['play_category'].isin(DRIVE_PLAY_CATEGORIES)).to_numpy()
+
+def add_drive_segments(game_plays):
+    """
+    Adds the line segment each drive play is drawn with: from its field position / time
+    (segment_x0, segment_y0) to the position after its yards, or the next play's position for
+    penalties (segment_x1), at the next play's time (segment_y1). The last play of a drive ends at
+    its own time; 'has_segment' is False for single-play drives and for plays not on a drive line.
+    Drives are (game_id, posteam, drive), so one call covers a game or a whole season.
+    """
+    drawn = drive_play_mask(game_plays)
+    plays = game_plays[drawn]
+    game = pd.factorize(plays['game_id'])[0] if 'game_id' in plays.columns else np.zeros(len(plays), dtype=int)
+    team = pd.factorize(plays['posteam'].astype(object))[0]
+    drive = plays['drive'].to_numpy(dtype=float)
+    order = np.lexsort((plays['play_id'].to_numpy(dtype=float), drive, team, game))
+
+    # Next play of the same drive, in play order (the play itself for a drive's last play)
+    same_drive = (game[order][1:] == game[order][:-1]) & (team[order][1:] == team[order][:-1]) & \
+                 (drive[order][1:] == drive[order][:-1])
+    has_next = np.append(same_drive, False)
+    has_previous = np.insert(same_drive, 0, False)
+    rows = np.arange(len(order))
+    next_play = np.empty(len(order), dtype=int)
+    next_play[order] = order[np.where(has_next, rows + 1, rows)]
+    in_drive = np.empty(len(order), dtype=bool)
+    in_drive[order] = has_next | has_previous
+
+    field_position = plays['field_position'].to_numpy(dtype=float)
+    time_elapsed = plays['time_elapsed_min'].to_numpy(dtype=float)
+    yards = plays['yards_gained_display'].to_numpy(dtype=float, na_value=np.nan)
+    is_penalty = (plays['play_category'] == 'penalty').to_numpy()
+    home_has_ball = (plays['home_team'].astype(object) == plays['posteam'].astype(object)).to_numpy()
+    field_pos_shift = np.where(is_penalty, field_position[next_play] - field_position,
+                               np.where(home_has_ball, yards, -yards))
+
+    segments = {column: np.full(len(game_plays), np.nan) for column in DRIVE_SEGMENT_COLUMNS[:-1]}
+    segments['segment_x0'][drawn] = field_position
+    segments['segment_x1'][drawn] = field_position + field_pos_shift
+    segments['segment_y0'][drawn] = time_elapsed
+    segments['segment_y1'][drawn] = time_elapsed[next_play]
+    for column, column_values in segments.items():
+        game_plays[column] = column_values
+    has_segment = np.zeros(len(game_plays), dtype=bool)
+    has_segment[drawn] = in_drive
+    game_plays['has_segment'] = has_segment
+    return game_plays
+
+def build_drive_table(game_plays):
+    """
+    One row per drive (game_id, drive) of SWEEP-enriched plays: team, start / end time (minutes
+    elapsed), start / end field position (home perspective, as drawn), plays (snaps with a down),
+    yards (net gain along the drawn segments), result (its last special outcome, 'other' if none),
+    points (the team's score change over the drive, conversions included)
+    and duration (minutes, to the start of the following play). Computed with one groupby,
+    so a season frame gives the whole season's drives in one pass.
+    """
+    if not set(DRIVE_SEGMENT_COLUMNS).issubset(game_plays.columns):
+        game_plays = add_drive_segments(game_plays.copy())
+    previous_play = shifted_positions(game_row_groups(game_plays),1)
+    in_drive = game_plays['drive'].notna().to_numpy()
+    drawn = drive_play_mask(game_plays)
+    posteam = game_plays['posteam'].astype(object).to_numpy()
+    home_team = game_plays['home_team'].astype(object).to_numpy()
+
+    # Scores before each play (0 - 0 before a game's first play) and after it
+    home_score = game_plays['total_home_score'].to_numpy(dtype=float, na_value=np.nan)
+    away_score = game_plays['total_away_score'].to_numpy(dtype=float, na_value=np.nan)
+    before = np.maximum(previous_play, 0)
+    home_score_before = np.where(previous_play >= 0, home_score[before], 0)
+    away_score_before = np.where(previous_play >= 0, away_score[before], 0)
+
+    x0 = game_plays['segment_x0'].to_numpy()
+    x1 = game_plays['segment_x1'].to_numpy()
+    time_elapsed = game_plays['time_elapsed_min'].to_numpy(dtype=float, na_value=np.nan)
+    next_time = game_plays['next_time_elapsed_min'].to_numpy(dtype=float, na_value=np.nan)
+
+    drive_rows = pd.DataFrame({
+        'game_id': game_plays['game_id'].to_numpy(dtype=object) if 'game_id' in game_plays.columns else '',
+        'drive': game_plays['drive'].to_numpy(dtype=float, na_value=np.nan),
+        'team': np.where(drawn, posteam, None),
+        'home_team': home_team,
+        'start_time': np.where(drawn, time_elapsed, np.nan),
+        'end_time': np.where(np.isnan(next_time), time_elapsed, next_time),
+        'start_field_position': x0,
+        'end_field_position': x1,
+        'plays': drawn,
+        'yards': np.where(posteam == home_team, x1 - x0, x0 - x1),
+        'result': game_plays['special_outcome'].astype(object).to_numpy(),
+        'home_score_before': home_score_before,
+        'away_score_before': away_score_before,
+        'home_score_after': home_score,
+        'away_score_after': away_score,
+    })[in_drive]
+    drives = drive_rows.groupby(['game_id', 'drive'], sort=False).agg(
+        team=('team', 'first'), home_team=('home_team', 'first'),
+        start_time=('start_time', 'first'), end_time=('end_time', 'last'),
+        start_field_position=('start_field_position', 'first'), end_field_position=('end_field_position', 'last'),
+        plays=('plays', 'sum'), yards=('yards', 'sum'), result=('result', 'last'),
+        home_score_before=('home_score_before', 'first'), away_score_before=('away_score_before', 'first'),
+        home_score_after=('home_score_after', 'last'), away_score_after=('away_score_after', 'last'))
+    drives = drives[drives['plays'] > 0].reset_index()
+
+    drives['result'] = drives['result'].fillna('other')
+    home_drive = (drives['team'] == drives.pop('home_team')).to_numpy()
+    drives['points'] = np.where(home_drive, drives['home_score_after'] - drives['home_score_before'],
+                                drives['away_score_after'] - drives['away_score_before'])
+    drives['duration'] = drives['end_time'] - drives['start_time']
+    if 'game_id' not in game_plays.columns:
+        drives = drives.drop(columns='game_id')
+    return drives[[column for column in DRIVE_TABLE_COLUMNS if column in drives.columns]]
+
 ###Get Hover Text for Visualization
 def create_hover_text(row):
     """Create detailed hover text for each play"""
@@ -407,16 +890,139 @@ def create_hover_text(row):
     return hover
     
 
-def create_final_display_data(game_plays):
+# customdata fields behind hover_template, in order
+HOVER_DATA_COLUMNS = ['qtr', 'time', 'situation', 'posteam', 'total_away_score', 'total_home_score',
+                      'yards_gained_display', 'play_excitement', 'desc']
+
+def create_hover_data(plays):
+    """
+    Compact per-play hover fields (HOVER_DATA_COLUMNS) for customdata, formatted in the browser
+    by hover_template. Parts create_hover_text includes or lays out per play are sent ready-made:
+    'situation' is the down & distance line ('' when there is no down), 'play_excitement' the
+    excitement line ('' when there is none) and 'desc' the description as create_hover_text wraps it.
+    Numbers are rounded to the precision the template shows.
+    """
+    def numbers(column):
+        return pd.to_numeric(plays[column], errors='coerce').astype(float)
+
+    def whole_numbers(column):
+        # Nullable ints so the JSON carries 7 rather than 7.0
+        return numbers(column).round().astype('Int64')
+
+    def text(column):
+        return plays[column].astype(object).map(str)
+
+    down = numbers('down')
+    has_down = down > 0
+    situation = (down.fillna(0).astype(int).astype(str) + ' & ' +
+                 numbers('ydstogo').fillna(0).astype(int).astype(str) + ' at ' +
+                 text('yrdln') + '<br>')
+    excitement = numbers('play_excitement')
+    excitement_line = 'Play excitement: ' + pd.Series(np.char.mod('%.1f', excitement.to_numpy()), index=plays.index) + '%<br>'
+    desc = plays['desc'].astype(object).fillna('').astype(str)
+    long_desc = desc.str.len() >= 150
+    desc = ('<br>' + desc.str[:150]).where(~long_desc, desc.str[:150] + '<br>' + desc.str[150:300])
+
+    return pd.DataFrame({
+        'qtr': whole_numbers('qtr'),
+        'time': text('time'),
+        'situation': situation.where(has_down, ''),
+        'posteam': text('posteam'),
+        'total_away_score': whole_numbers('total_away_score'),
+        'total_home_score': whole_numbers('total_home_score'),
+        'yards_gained_display': whole_numbers('yards_gained_display'),
+        'play_excitement': excitement_line.where(excitement > 0, ''),
+        'desc': desc,
+    }, index=plays.index)[HOVER_DATA_COLUMNS]
+
+def hover_template(home_team, away_team):
+    """Shared hovertemplate laying out create_hover_data's customdata like create_hover_text"""
+    field = {column: f'customdata[{i}]' for i, column in enumerate(HOVER_DATA_COLUMNS)}
+    return (
+        f"<b>Q%{{{field['qtr']}}} %{{{field['time']}}}</b><br>"
+        f"%{{{field['situation']}}}"
+        f"<b>%{{{field['posteam']}}}</b> possession<br>"
+        f"Score: {away_team} %{{{field['total_away_score']}}} - {home_team} %{{{field['total_home_score']}}}<br>"
+        f"Yards gained: %{{{field['yards_gained_display']}:.0f}}<br>"
+        f"%{{{field['play_excitement']}}}"
+        f"%{{{field['desc']}}}<extra></extra>"
+    )
+
+def build_hover_text(plays,rows=None):
+    """
+    Vectorized create_hover_text: the same hover string for every play, built with column-wise
+    string operations instead of one f-string per row. rows (boolean mask) limits the work to the
+    plays that are consumed; the others get NaN.
+    """
+    if rows is not None:
+        hover = pd.Series(np.nan, index=plays.index, dtype=object)
+        hover[rows] = build_hover_text(plays[rows])
+        return hover
+
+    def column(name, default):
+        return plays[name] if name in plays.columns else pd.Series(default, index=plays.index)
+
+    def text(name, default):
+        # str() of each value like the f-string does, so missing values read 'nan' instead of blanking the row
+        return column(name, default).astype(object).map(str)
+
+    def numbers(name):
+        return pd.to_numeric(column(name, 0), errors='coerce').astype(float)
+
+    def whole_numbers(name):
+        return numbers(name).astype(int).astype(str)
+
+    def formatted(name, spec):
+        return pd.Series(np.char.mod(spec, numbers(name).to_numpy()), index=plays.index).astype(object)
+
+    down = numbers('down')
+    situation = (down.fillna(0).astype(int).astype(str) + ' & ' +
+                 numbers('ydstogo').fillna(0).astype(int).astype(str) + ' at ' +
+                 text('yrdln', '?') + '<br>')
+    excitement = numbers('play_excitement')
+    desc = column('desc', 'No description').astype(object).fillna('').astype(str)
+    long_desc = desc.str.len() >= 150
+
+    hover = ('<b>Q' + text('qtr', '?') + ' ' + text('time', '?') + '</b><br>' +
+             situation.where(down > 0, '') +
+             '<b>' + text('posteam', '?') + '</b> possession<br>' +
+             'Score: ' + text('away_team', 0) + ' ' + whole_numbers('total_away_score') + ' - ' +
+             text('home_team', 0) + ' ' + whole_numbers('total_home_score') + '<br>' +
+             'Yards gained: ' + formatted('yards_gained_display', '%.0f') + '<br>' +
+             ('Play excitement: ' + formatted('play_excitement', '%.1f') + '%<br>').where(excitement > 0, ''))
+    return hover + ('<br>' + desc.str[:150]).where(~long_desc, desc.str[:150] + '<br>' + desc.str[150:300])
+
+def hover_rows(game_plays):
+    """Plays whose hover text a SWEEP figure shows: drive plays, special outcomes and conversion attempts"""
+    rows = game_plays['field_position'].notna() & game_plays['play_category'].isin(DRIVE_PLAY_CATEGORIES)
+    rows |= game_plays['special_outcome'].notna()
+    for result_col in ('extra_point_result', 'two_point_conv_result'):
+        if result_col in game_plays.columns:
+            rows |= game_plays[result_col].notna()
+    return rows
+
+def create_final_display_data(game_plays,hover_text=True):
+    """
+    Adds 'yards_gained_display' and the per-play 'hover_text' strings: for every play
+    (hover_text=True), only the plays a figure shows (hover_text='plotted', NaN elsewhere)
+    or none (hover_text=False, for figures drawn with hover='template').
+    """
     ### Calcualte total yards gained
 
-    game_plays['yards_gained_display'] = game_plays.apply(
-    lambda row: row.get('penalty_yards', 0) if row['play_category'] == 'penalty' and pd.notna(row.get('penalty_yards'))
-    else row.get('yards_gained', 0),
-    axis=1)
+    # Penalty yards for penalties that have them, yards gained otherwise (0 when a column is missing)
+    yards_gained = (game_plays['yards_gained'].to_numpy(dtype=float, na_value=np.nan) if 'yards_gained' in game_plays.columns
+                    else np.zeros(len(game_plays)))
+    if 'penalty_yards' in game_plays.columns:
+        penalty_yards = game_plays['penalty_yards'].to_numpy(dtype=float, na_value=np.nan)
+        use_penalty_yards = (game_plays['play_category'] == 'penalty').to_numpy() & ~np.isnan(penalty_yards)
+        yards_gained = np.where(use_penalty_yards, penalty_yards, yards_gained)
+    game_plays['yards_gained_display'] = yards_gained
 
-    ### Calcualte Hover Text using Helper Function
-    game_plays['hover_text'] = game_plays.apply(create_hover_text, axis=1)
+    ### Calcualte Hover Text (vectorized create_hover_text)
+    if hover_text == 'plotted':
+        game_plays['hover_text'] = build_hover_text(game_plays,hover_rows(game_plays))
+    elif hover_text:
+        game_plays['hover_text'] = build_hover_text(game_plays)
     
     return game_plays 
 
@@ -1,37 +1,449 @@
 import nfl_data_py as nfl
 import requests
 import pandas as pd
-from io import BytesIO
+import os
+import json
+import time
+import gzip
+import io
+import hashlib
+import tempfile
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+from .sweep_data import game_catalog, find_games, flag_admin_events
 
-def download_nfl_data_season(season=2025):
-    """Download NFL data using requests library"""
-    url = f"https://github.com/nflverse/nflverse-data/releases/download/pbp/play_by_play_{season}.csv.gz"
-    
-    print(f"Downloading {season} season...")
-    
-    # Download with SSL verification disabled
-    response = requests.get(url, verify=False)
-    
-    if response.status_code == 200:
-        print(f"✓ Download complete")
-        # Load directly from bytes
-        pbp = pd.read_csv(BytesIO(response.content), compression='gzip', low_memory=False)
-        print(f"✓ Loaded {len(pbp):,} plays")
-        return pbp
-    else:
-        print(f"✗ Error: {response.status_code}")
+NFL_DATA_URL = "https://github.com/nflverse/nflverse-data/releases/download/pbp/play_by_play_{season}.csv.gz"
+
+### Local season cache: one parquet file per season plus a small json sidecar
+### holding the upstream validators (ETag / Last-Modified) used for revalidation.
+SEASON_CACHE_DIR = os.environ.get('SWEEP_CACHE_DIR', os.path.join(os.path.expanduser('~'), '.cache', 'sweep'))
+SEASON_CACHE_MAX_BYTES = 2 * 1024**3
+
+### Size of the reads pulled off the HTTP socket while streaming a season
+STREAM_CHUNK_BYTES = 1024**2
+
+### Columns the SWEEP pipeline (sweep_data, sweep_viz) actually reads, with compact load dtypes.
+### Everything else in the ~370 column play-by-play file is skipped at parse time.
+SWEEP_SCHEMA = {
+    # Game identifiers
+    'game_id': 'category',
+    'play_id': 'float64',
+    'season': 'int16',
+    'week': 'int8',
+    'season_type': 'category',
+    'game_date': 'category',
+    'home_team': 'category',
+    'away_team': 'category',
+    # Clock and field
+    'qtr': 'Int8',
+    'down': 'Int8',
+    'ydstogo': 'Int8',
+    'time': 'category',
+    'quarter_seconds_remaining': 'float32',
+    'game_seconds_remaining': 'float32',
+    'yardline_100': 'float32',
+    'yrdln': 'category',
+    'drive': 'float32',
+    # Play description and outcome
+    'posteam': 'category',
+    'defteam': 'category',
+    'td_team': 'category',
+    'desc': 'object',
+    'play_type': 'category',
+    'yards_gained': 'float32',
+    'penalty': 'float32',
+    'penalty_yards': 'float32',
+    'touchdown': 'float32',
+    'interception': 'float32',
+    'fumble_lost': 'float32',
+    'punt_attempt': 'float32',
+    'fourth_down_failed': 'float32',
+    'first_down': 'float32',
+    'first_down_pass': 'float32',
+    'first_down_rush': 'float32',
+    'field_goal_result': 'category',
+    'extra_point_result': 'category',
+    'two_point_conv_result': 'category',
+    # Score and win probability
+    'total_home_score': 'Int16',
+    'total_away_score': 'Int16',
+    'home_score': 'Int16',
+    'away_score': 'Int16',
+    'wp': 'float32',
+    'vegas_wp': 'float32',
+}
+
+### Team code columns share one categorical dtype so they can be compared column to column
+TEAM_COLUMNS = ['home_team', 'away_team', 'posteam', 'defteam', 'td_team']
+
+def schema_tag(schema):
+    """Short stable name for a load schema, used to key the season cache"""
+    if schema is None:
+        return 'full'
+    if schema is SWEEP_SCHEMA:
+        return 'sweep'
+    digest = hashlib.md5(json.dumps({col: str(dtype) for col, dtype in schema.items()}, sort_keys=True).encode())
+    return 'schema-' + digest.hexdigest()[:8]
+
+def unify_team_categories(pbp):
+    """Give every team code column the same category set"""
+    team_columns = [col for col in TEAM_COLUMNS if col in pbp.columns]
+    teams = set()
+    for col in team_columns:
+        teams.update(pbp[col].dropna().unique())
+    team_dtype = pd.CategoricalDtype(sorted(str(team) for team in teams))
+    for col in team_columns:
+        pbp[col] = pbp[col].astype(object).astype(team_dtype)
+    return pbp
+
+def default_dtype_bytes(pbp):
+    """Estimate what a frame's columns would occupy at read_csv's default dtypes (float64/int64/object)"""
+    total = 0
+    for col in pbp.columns:
+        if pd.api.types.is_numeric_dtype(pbp[col]) and not isinstance(pbp[col].dtype, pd.CategoricalDtype):
+            total += 8 * len(pbp)
+        else:
+            total += pbp[col].astype(object).memory_usage(deep=True, index=False)
+    return total
+
+def report_schema_memory(pbp, total_columns=None):
+    """Print the in-memory size of a schema-loaded frame and what the schema saved"""
+    compact_bytes = pbp.memory_usage(deep=True).sum()
+    default_bytes = default_dtype_bytes(pbp)
+    saved = 1 - compact_bytes / default_bytes if default_bytes else 0
+    skipped = f", {total_columns - pbp.shape[1]} columns skipped" if total_columns else ""
+    print(f"✓ Kept {pbp.shape[1]}{' of ' + str(total_columns) if total_columns else ''} columns: "
+          f"{compact_bytes / 1024**2:.1f} MB vs {default_bytes / 1024**2:.1f} MB at default dtypes "
+          f"({saved:.0%} smaller{skipped})")
+    return dict(compact_bytes=int(compact_bytes), default_bytes=int(default_bytes), total_columns=total_columns)
+
+def apply_sweep_schema(pbp, schema=SWEEP_SCHEMA, report=True):
+    """Project an already loaded play-by-play frame onto a load schema and cast it to the compact dtypes"""
+    columns = [col for col in schema if col in pbp.columns]
+    compact = pbp[columns].astype({col: schema[col] for col in columns})
+    compact = flag_admin_events(unify_team_categories(compact))
+    if report:
+        before = pbp.memory_usage(deep=True).sum()
+        after = compact.memory_usage(deep=True).sum()
+        print(f"✓ Compacted season frame: {before / 1024**2:.1f} MB → {after / 1024**2:.1f} MB "
+              f"({1 - after / before:.0%} smaller)")
+    return compact
+
+def season_cache_paths(season, cache_dir=None, tag='full'):
+    """Return the (data, metadata) file paths for a cached season loaded with the schema named by tag"""
+    cache_dir = cache_dir or SEASON_CACHE_DIR
+    data_path = os.path.join(cache_dir, f"play_by_play_{season}.{tag}.parquet")
+    meta_path = os.path.join(cache_dir, f"play_by_play_{season}.{tag}.json")
+    return data_path, meta_path
+
+def load_cached_season(season, cache_dir=None, tag='full'):
+    """Load a season from the local cache, or None if it is not cached"""
+    data_path, meta_path = season_cache_paths(season, cache_dir, tag)
+    if not os.path.exists(data_path):
         return None
-        
-def view_games(season_data, week = None, team = None):
-    season_data_ = season_data.copy()
-    if week == None:
-        pass
-    else:
-        season_data_ = season_data_[season_data_['week']==week]
-    if team == None:
-            pass
+    try:
+        pbp = pd.read_parquet(data_path)
+    except Exception as e:
+        print(f"✗ Cached {season} season unreadable ({e}), ignoring cache")
+        return None
+    # Touch the file so eviction treats it as recently used
+    os.utime(data_path, None)
+    return pbp
+
+def read_season_cache_meta(season, cache_dir=None, tag='full'):
+    """Return the stored upstream metadata for a cached season (empty dict if none)"""
+    data_path, meta_path = season_cache_paths(season, cache_dir, tag)
+    if not os.path.exists(meta_path):
+        return {}
+    with open(meta_path) as f:
+        return json.load(f)
+
+def save_cached_season(season, pbp, meta=None, cache_dir=None, max_bytes=None, tag='full'):
+    """Write a parsed season to the cache and evict least recently used seasons over the size cap"""
+    cache_dir = cache_dir or SEASON_CACHE_DIR
+    data_path, meta_path = season_cache_paths(season, cache_dir, tag)
+    os.makedirs(cache_dir, exist_ok=True)
+
+    # Write to a temp file first so a crash never leaves a half-written season behind
+    tmp_path = data_path + '.tmp'
+    try:
+        pbp.to_parquet(tmp_path, index=False)
+    except Exception as e:
+        print(f"✗ Could not cache {season} season: {e}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return None
+    os.replace(tmp_path, data_path)
+
+    meta = dict(meta or {})
+    meta['season'] = season
+    meta['schema'] = tag
+    meta['rows'] = len(pbp)
+    meta['cached_at'] = time.time()
+    with open(meta_path, 'w') as f:
+        json.dump(meta, f)
+
+    evict_season_cache(cache_dir, max_bytes, keep=[data_path])
+    return data_path
+
+def season_cache_entries(cache_dir=None):
+    """List cached seasons as dicts of path, size and last-used time, oldest first"""
+    cache_dir = cache_dir or SEASON_CACHE_DIR
+    if not os.path.isdir(cache_dir):
+        return []
+    entries = []
+    for name in os.listdir(cache_dir):
+        if not (name.startswith('play_by_play_') and name.endswith('.parquet')):
+            continue
+        path = os.path.join(cache_dir, name)
+        stat = os.stat(path)
+        entries.append(dict(path=path, size=stat.st_size, last_used=stat.st_mtime))
+    return sorted(entries, key=lambda entry: entry['last_used'])
+
+def evict_season_cache(cache_dir=None, max_bytes=None, keep=()):
+    """Remove least recently used seasons until the cache fits under max_bytes"""
+    max_bytes = SEASON_CACHE_MAX_BYTES if max_bytes is None else max_bytes
+    entries = season_cache_entries(cache_dir)
+    total = sum(entry['size'] for entry in entries)
+    evicted = []
+    for entry in entries:
+        if total <= max_bytes:
+            break
+        if entry['path'] in keep:
+            continue
+        os.remove(entry['path'])
+        meta_path = entry['path'][:-len('.parquet')] + '.json'
+        if os.path.exists(meta_path):
+            os.remove(meta_path)
+        total -= entry['size']
+        evicted.append(entry['path'])
+    return evicted
+
+def clear_season_cache(cache_dir=None):
+    """Delete every cached season"""
+    return evict_season_cache(cache_dir, max_bytes=0)
+
+def read_season_csv(source, schema=None, compression='infer', report=True):
+    """
+    Parse a play-by-play csv from a path or binary stream.
+    With a schema, only its columns are parsed (usecols) and they are read at the schema dtypes,
+    in chunks as the data arrives. Without one, dtypes are inferred over the whole file (low_memory=False)
+    so columns are not split into mixed types, which means the text is buffered before parsing.
+    Adds the 'is_admin_event' flag filter_non_plays reuses.
+    """
+    read_csv_kwargs = dict(compression=compression)
+    header = set()
+    if schema is None:
+        read_csv_kwargs['low_memory'] = False
     else:
-        season_data_ = season_data_[(season_data_['home_team']==team)|(season_data_['away_team']==team)]
-    print(season_data_[['game_id','week','home_team','away_team','week']].drop_duplicates().head(50))
+        # Callable usecols tolerates schema columns missing from older seasons and records the full header
+        read_csv_kwargs['usecols'] = lambda col: header.add(col) or col in schema
+        read_csv_kwargs['dtype'] = {col: dtype for col, dtype in schema.items() if dtype != 'object'}
+
+    pbp = pd.read_csv(source, **read_csv_kwargs)
+
+    if schema is not None:
+        pbp = unify_team_categories(pbp[[col for col in schema if col in pbp.columns]])
+        if report:
+            report_schema_memory(pbp, total_columns=len(header))
+    return flag_admin_events(pbp)
+
+def read_season_stream(response, schema=None, chunk_size=STREAM_CHUNK_BYTES, report=True):
+    """
+    Parse a gzipped play-by-play csv straight off a streamed HTTP response.
+    The body is pulled in chunk_size reads, decompressed incrementally and fed to the csv parser,
+    so the compressed body is never held in memory alongside the parsed frame. With a schema the
+    parser also works chunk by chunk, so the decompressed text is never held whole either.
+    """
+    # Undo any transport-level Content-Encoding; the .csv.gz payload itself is gunzipped below
+    response.raw.decode_content = True
+    with gzip.GzipFile(fileobj=response.raw) as decompressed:
+        stream = io.BufferedReader(decompressed, buffer_size=chunk_size)
+        return read_season_csv(stream, schema, compression=None, report=report)
+
+def cache_validators(season, cache_dir=None, tag='full'):
+    """Conditional request headers built from a cached season's stored ETag / Last-Modified"""
+    meta = read_season_cache_meta(season, cache_dir, tag)
+    headers = {}
+    if meta.get('etag'):
+        headers['If-None-Match'] = meta['etag']
+    if meta.get('last_modified'):
+        headers['If-Modified-Since'] = meta['last_modified']
+    return headers
+
+def make_session(pool_size=8, retries=3):
+    """requests.Session with a connection pool sized for pool_size concurrent season downloads"""
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retries)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    # SSL verification disabled, as for single season downloads
+    session.verify = False
+    return session
+
+def download_nfl_data_season(season=2025, use_cache=True, cache_dir=None, revalidate=False, max_cache_bytes=None,
+                             schema=SWEEP_SCHEMA, session=None):
+    """
+    Download NFL data using requests library.
+    By default only the SWEEP_SCHEMA columns are loaded, at compact dtypes; pass schema=None for every column.
+    When use_cache is set, a season already in the local cache is loaded from disk and upstream
+    is only contacted if revalidate=True (a conditional request, so unchanged data is not re-downloaded).
+    """
+    url = NFL_DATA_URL.format(season=season)
+    tag = schema_tag(schema)
+
+    cached = None
+    headers = {}
+    if use_cache:
+        cached = load_cached_season(season, cache_dir, tag)
+        if cached is not None and not revalidate:
+            print(f"✓ Loaded {len(cached):,} plays for {season} season from cache")
+            return cached
+        if cached is not None:
+            headers = cache_validators(season, cache_dir, tag)
+
+    print(f"Downloading {season} season...")
+
+    # Download with SSL verification disabled, streaming the body rather than buffering it
+    get = session.get if session is not None else requests.get
+    with get(url, verify=False, headers=headers, stream=True) as response:
+        if response.status_code == 304 and cached is not None:
+            print(f"✓ Cached {season} season is up to date")
+            print(f"✓ Loaded {len(cached):,} plays")
+            return cached
+        elif response.status_code == 200:
+            # Decompress and parse as the body arrives
+            pbp = read_season_stream(response, schema)
+            print(f"✓ Download complete")
+            print(f"✓ Loaded {len(pbp):,} plays")
+        else:
+            print(f"✗ Error: {response.status_code}")
+            return cached
+
+    if use_cache:
+        meta = dict(url=url,
+                    etag=response.headers.get('ETag'),
+                    last_modified=response.headers.get('Last-Modified'))
+        save_cached_season(season, pbp, meta, cache_dir, max_cache_bytes, tag)
+    return pbp
+
+def fetch_season_file(session, season, download_dir, headers=None, chunk_size=STREAM_CHUNK_BYTES):
+    """
+    Stream one season's compressed csv to a file in download_dir.
+    Returns (status_code, path or None, response headers, seconds spent).
+    """
+    url = NFL_DATA_URL.format(season=season)
+    start = time.perf_counter()
+    with session.get(url, headers=headers or {}, stream=True) as response:
+        if response.status_code != 200:
+            return response.status_code, None, dict(response.headers), time.perf_counter() - start
+        path = os.path.join(download_dir, f"play_by_play_{season}.csv.gz")
+        with open(path, 'wb') as f:
+            for chunk in response.iter_content(chunk_size):
+                f.write(chunk)
+    return 200, path, dict(response.headers), time.perf_counter() - start
+
+def parse_season_file(path, schema=None):
+    """Process pool entry point: parse a downloaded season file, returning (frame, seconds spent)"""
+    start = time.perf_counter()
+    pbp = read_season_csv(path, schema, compression='gzip', report=False)
+    return pbp, time.perf_counter() - start
+
+def concat_seasons(frames):
+    """Concatenate season frames, keeping categorical columns categorical across seasons"""
+    pbp = pd.concat(frames, ignore_index=True)
+    for col in set().union(*(frame.columns for frame in frames)):
+        if any(isinstance(frame[col].dtype, pd.CategoricalDtype) for frame in frames if col in frame.columns):
+            if not isinstance(pbp[col].dtype, pd.CategoricalDtype):
+                pbp[col] = pbp[col].astype('category')
+    return unify_team_categories(pbp)
+
+def download_nfl_data_seasons(seasons, max_workers=8, parse_workers=None, as_dict=False, use_cache=True,
+                              cache_dir=None, revalidate=False, max_cache_bytes=None, schema=SWEEP_SCHEMA):
+    """
+    Download several seasons at once.
+    Downloads share one pooled requests.Session and overlap across a thread pool of max_workers,
+    and each finished file is parsed in a process pool (parse_workers, default one per CPU) while
+    the remaining downloads continue. Cached seasons are loaded from disk as in download_nfl_data_season.
+    Returns (data, timings): data is one concatenated frame, or a dict by season when as_dict=True;
+    timings holds per-season source, download/parse seconds and row counts.
+    """
+    seasons = list(seasons)
+    tag = schema_tag(schema)
+    frames = {}
+    timings = {}
+    to_fetch = {}
+
+    for season in seasons:
+        headers = {}
+        if use_cache:
+            start = time.perf_counter()
+            cached = load_cached_season(season, cache_dir, tag)
+            if cached is not None and not revalidate:
+                frames[season] = cached
+                timings[season] = dict(source='cache', download_s=0.0, parse_s=time.perf_counter() - start,
+                                       rows=len(cached))
+                continue
+            if cached is not None:
+                frames[season] = cached
+                headers = cache_validators(season, cache_dir, tag)
+        to_fetch[season] = headers
+
+    if to_fetch:
+        print(f"Downloading {len(to_fetch)} seasons with {max_workers} connections...")
+    start = time.perf_counter()
+    with tempfile.TemporaryDirectory() as download_dir, make_session(max_workers) as session, \
+            ThreadPoolExecutor(max_workers=max_workers) as downloads, \
+            ProcessPoolExecutor(max_workers=parse_workers) as parsers:
+        fetches = {downloads.submit(fetch_season_file, session, season, download_dir, headers): season
+                   for season, headers in to_fetch.items()}
+        parses = {}
+        for future in as_completed(fetches):
+            season = fetches[future]
+            try:
+                status, path, response_headers, download_s = future.result()
+            except OSError as e:
+                # Network errors (requests.RequestException) and local write errors fail only their own season
+                print(f"✗ {season}: could not download ({type(e).__name__}: {e})")
+                timings[season] = dict(source='error', download_s=None, parse_s=None, rows=0)
+                continue
+            if status == 304 and season in frames:
+                timings[season] = dict(source='cache', download_s=download_s, parse_s=0.0, rows=len(frames[season]))
+            elif status == 200:
+                meta = dict(url=NFL_DATA_URL.format(season=season),
+                            etag=response_headers.get('ETag'),
+                            last_modified=response_headers.get('Last-Modified'))
+                parses[parsers.submit(parse_season_file, path, schema)] = (season, download_s, meta)
+            else:
+                print(f"✗ {season}: Error {status}")
+                timings[season] = dict(source='error', download_s=download_s, parse_s=None, rows=0)
+
+        for future in as_completed(parses):
+            season, download_s, meta = parses[future]
+            try:
+                pbp, parse_s = future.result()
+            except Exception as e:
+                # A corrupt file fails only its own season
+                print(f"✗ {season}: could not parse ({type(e).__name__}: {e})")
+                timings[season] = dict(source='error', download_s=download_s, parse_s=None, rows=0)
+                continue
+            frames[season] = pbp
+            timings[season] = dict(source='network', download_s=download_s, parse_s=parse_s, rows=len(pbp))
+            if use_cache:
+                save_cached_season(season, pbp, meta, cache_dir, max_cache_bytes, tag)
+
+    loaded = [season for season in seasons if timings.get(season, {}).get('source') in ('cache', 'network')]
+    print(f"✓ Loaded {sum(timings[season]['rows'] for season in loaded):,} plays from {len(loaded)} seasons "
+          f"in {time.perf_counter() - start:.1f}s")
+
+    if as_dict:
+        return {season: frames[season] for season in loaded}, timings
+    if not loaded:
+        return None, timings
+    return concat_seasons([frames[season] for season in loaded]), timings
+
+def view_games(season_data, week = None, team = None):
+    # Look games up in the season's game catalog instead of scanning every play
+    games = find_games(game_catalog(season_data), week, team).reset_index()
+    print(games[['game_id','week','home_team','away_team','week']].head(50))
     
-    return list(season_data_[['game_id','week','home_team','away_team','week']].drop_duplicates()['game_id'])
\ No newline at end of file
+    return list(games['game_id'])
\ No newline at end of file
@@ -0,0 +1,376 @@
+import copy
+import gzip
+import json
+import base64
+import os
+import numpy as np
+import pandas as pd
+import plotly.io as pio
+import plotly.graph_objects as go
+from plotly.utils import PlotlyJSONEncoder
+from plotly.offline import get_plotlyjs
+
+# ============================================================================
+# Dict-based figure builder: the same add_* / update_* calls as go.Figure, without property validation
+# ============================================================================
+TEMPLATE_CACHE = {}
+
+def default_template():
+    """The default plotly template as a plain dict (as go.Figure().to_dict() writes it), cached per template name"""
+    name = pio.templates.default
+    if name not in TEMPLATE_CACHE:
+        TEMPLATE_CACHE[name] = go.Figure().to_dict()['layout'].get('template')
+    return copy.deepcopy(TEMPLATE_CACHE[name])
+
+# ============================================================================
+# Array handling as plotly's validators and to_json do it, implemented here with numpy
+# (the plotly helpers for this live in the private _plotly_utils package)
+# ============================================================================
+# plotly.js typed array dtype codes
+TYPED_ARRAY_DTYPES = {'int8': 'i1', 'uint8': 'u1', 'int16': 'i2', 'uint16': 'u2', 'int32': 'i4', 'uint32': 'u4',
+                      'float32': 'f4', 'float64': 'f8'}
+# Keys whose arrays plotly never encodes as typed arrays
+UNENCODED_KEYS = ('geojson', 'layer', 'layers', 'range')
+
+def is_array(value):
+    """numpy arrays, pandas Series / Index and other objects exposing the array interface (not lists)"""
+    if isinstance(value, (np.ndarray, pd.Series, pd.Index)):
+        return True
+    return (hasattr(value, '__array__') or hasattr(value, '__array_interface__')) and np.ndim(value) > 0
+
+def readonly_array(values):
+    """Read-only numpy copy of an array; anything but numbers / datetimes becomes an object array"""
+    arr = values.to_numpy() if isinstance(values, (pd.Series, pd.Index)) else np.asarray(values)
+    arr = arr.astype(object) if arr.dtype.kind not in 'uifOM' else arr.copy(order='C')
+    arr.flags.writeable = False
+    return arr
+
+def plain_value(value):
+    """numpy scalars as Python scalars, arrays and tuples as (nested) lists"""
+    if isinstance(value, np.generic):
+        if value.dtype == np.dtype('datetime64[ns]'):
+            return value.astype('datetime64[us]').item()
+        return value.item()
+    if isinstance(value, (list, tuple)) or is_array(value):
+        return [plain_value(v) for v in value]
+    return value
+
+def typed_array(arr):
+    """plotly.js typed array spec ({'dtype', 'bdata'[, 'shape']}) for a numeric array, the array itself otherwise"""
+    arr = readonly_array(arr)
+    if arr.size == 0:
+        return arr
+    if arr.dtype == np.int64 or arr.dtype == np.uint64:
+        # plotly.js has no 64-bit ints: use the smallest type that holds the values, else leave the array as is
+        candidates = ['int8', 'int16', 'int32'] if arr.dtype == np.int64 else ['uint8', 'uint16', 'uint32']
+        fits = [dtype for dtype in candidates if np.iinfo(dtype).min <= arr.min() and arr.max() <= np.iinfo(dtype).max]
+        if not fits:
+            return arr
+        arr = arr.astype(fits[0])
+    if str(arr.dtype) not in TYPED_ARRAY_DTYPES:
+        return arr
+    spec = {'dtype': TYPED_ARRAY_DTYPES[str(arr.dtype)], 'bdata': base64.b64encode(arr).decode('ascii')}
+    if arr.ndim > 1:
+        spec['shape'] = str(arr.shape)[1:-1]
+    return spec
+
+def convert_to_base64(obj):
+    """Replace every array in a figure dict with its typed array spec, in place, as go.Figure.to_dict() does"""
+    if isinstance(obj, dict):
+        for key, value in obj.items():
+            if key in UNENCODED_KEYS:
+                continue
+            if is_array(value):
+                obj[key] = typed_array(value)
+            else:
+                convert_to_base64(value)
+    elif isinstance(obj, (list, tuple)):
+        for value in obj:
+            convert_to_base64(value)
+
+def spec_value(value):
+    """Arrays the way plotly's validators store them (read-only numpy arrays / plain lists), dicts with sorted keys"""
+    if isinstance(value, dict):
+        return spec_props(value)
+    if is_array(value):
+        return readonly_array(value)
+    if isinstance(value, (list, tuple)):
+        return [spec_props(v) if isinstance(v, dict) else plain_value(v) for v in value]
+    return plain_value(value)
+
+def spec_props(props):
+    """Property dict with keys in the alphabetical order plotly objects serialize them in"""
+    return {key: spec_value(props[key]) for key in sorted(props) if props[key] is not None}
+
+### Property names that contain an underscore themselves, so magic underscores never split them
+UNDERSCORE_PROPS = {'error_x', 'error_y', 'error_z', 'copy_xstyle', 'copy_ystyle', 'copy_zstyle',
+                    'paper_bgcolor', 'plot_bgcolor'}
+
+def underscore_path(key):
+    """Split a magic underscore key (xaxis_title_font_size) into its property path"""
+    path = []
+    for part in key.split('_'):
+        if path and f"{path[-1]}_{part}" in UNDERSCORE_PROPS:
+            path[-1] = f"{path[-1]}_{part}"
+        else:
+            path.append(part)
+    return path
+
+def magic_underscores(props):
+    """Expand title_text=... style keyword arguments into nested dicts, as plotly does"""
+    expanded = {}
+    for key, value in props.items():
+        *parents, child = underscore_path(key)
+        target = expanded
+        for parent in parents:
+            node = target.get(parent, {})
+            if not isinstance(node, dict):
+                raise ValueError(f"Cannot set {key}: {parent} is already set to a non-dict value")
+            # Copy on the way down so dicts passed in by the caller are never modified
+            target[parent] = dict(node)
+            target = target[parent]
+        if isinstance(value, dict) and isinstance(target.get(child), dict):
+            target[child] = {**target[child], **value}
+        else:
+            target[child] = value
+    return expanded
+
+def update_props(target, props):
+    """
+    Merge props into target like BaseFigure.update: nested dicts are created first (in call order),
+    then every value is set, so compound properties serialize ahead of scalars
+    """
+    for key, value in props.items():
+        if isinstance(value, dict) and not isinstance(target.get(key), dict):
+            target[key] = {}
+    for key, value in props.items():
+        if isinstance(value, dict):
+            update_props(target[key], value)
+        elif isinstance(value, (list, tuple)) and value and all(isinstance(v, dict) for v in value):
+            target[key] = [spec_props(v) for v in value]
+        else:
+            target[key] = spec_value(value)
+    return target
+
+
+class FigureSpec:
+    """
+    Plain-dict stand-in for go.Figure supporting only add_scatter, add_annotation, add_shape,
+    update_layout, update_xaxes and update_yaxes, with plain property names and magic underscores.
+    Skips graph_objects validation, so invalid properties are not caught; for the calls the SWEEP
+    add_* functions make, to_json() matches go.Figure.to_json().
+    """
+    def __init__(self):
+        self.data = []
+        self.layout = {'template': default_template()}
+
+    def add_scatter(self, **props):
+        trace = spec_props(magic_underscores(props))
+        trace['type'] = 'scatter'
+        self.data.append(trace)
+        return self
+
+    def add_annotation(self, arg=None, **props):
+        self.layout.setdefault('annotations', []).append(spec_props(magic_underscores({**(arg or {}), **props})))
+        return self
+
+    def add_shape(self, arg=None, **props):
+        self.layout.setdefault('shapes', []).append(spec_props(magic_underscores({**(arg or {}), **props})))
+        return self
+
+    def update_layout(self, dict1=None, **props):
+        update_props(self.layout, magic_underscores({**(dict1 or {}), **props}))
+        return self
+
+    def update_xaxes(self, patch=None, **props):
+        update_props(self.layout.setdefault('xaxis', {}), magic_underscores({**(patch or {}), **props}))
+        return self
+
+    def update_yaxes(self, patch=None, **props):
+        update_props(self.layout.setdefault('yaxis', {}), magic_underscores({**(patch or {}), **props}))
+        return self
+
+    def to_plotly_json(self):
+        """Figure dict with arrays left as numpy arrays / lists"""
+        return copy.deepcopy({'data': self.data, 'layout': self.layout})
+
+    def to_dict(self):
+        """Figure dict with numeric arrays base64-encoded, as go.Figure.to_dict() returns it"""
+        fig_dict = self.to_plotly_json()
+        convert_to_base64(fig_dict)
+        return fig_dict
+
+    def to_json(self, **kwargs):
+        return pio.to_json(self.to_dict(), validate=False, **kwargs)
+
+    def write_json(self, file, **kwargs):
+        return pio.write_json(self.to_dict(), file, validate=False, **kwargs)
+
+    def write_html(self, file, **kwargs):
+        return pio.write_html(self.to_dict(), file, validate=False, **kwargs)
+
+    def to_figure(self):
+        """Validated go.Figure built from the spec (only when a graph_objects figure is actually needed)"""
+        return go.Figure(self.to_dict())
+
+
+# ============================================================================
+# Compact export: rounded typed arrays, shared trace styles hoisted into the template, optional gzip
+# ============================================================================
+# Decimal places kept per trace array (field position in yards, time in minutes, WP in percent)
+PAYLOAD_DECIMALS = {'x': 1, 'y': 2, 'customdata': 1}
+# Trace properties never moved into the template
+UNTEMPLATED_PROPS = {'type', 'name', 'uid', 'visible'}
+
+def figure_props(fig):
+    """Plain figure dict (arrays not yet base64-encoded) from a go.Figure, FigureSpec or figure dict"""
+    if isinstance(fig, dict):
+        return copy.deepcopy(fig)
+    if isinstance(fig, FigureSpec):
+        return fig.to_plotly_json()
+    return {'data': [trace.to_plotly_json() for trace in fig.data], 'layout': fig.layout.to_plotly_json()}
+
+def compact_array(values, decimals):
+    """
+    Round a numeric array to decimals places and store it in the smallest typed array that holds it:
+    integers when every value is whole (downcast to int8/16/32 on encoding), float32 otherwise.
+    Non-numeric arrays are returned unchanged.
+    """
+    arr = np.asarray(values)
+    if arr.dtype.kind == 'O':
+        try:
+            arr = arr.astype(float)
+        except (TypeError, ValueError):
+            return values
+    if arr.ndim != 1 or arr.size == 0 or arr.dtype.kind not in 'iuf':
+        return values
+    if arr.dtype.kind != 'f':
+        return arr.astype(np.int64)
+    arr = np.round(arr, decimals)
+    if np.isfinite(arr).all() and (arr == np.round(arr)).all() and np.abs(arr).max() < 2**31:
+        return arr.astype(np.int64)
+    return arr.astype(np.float32)
+
+def style_leaves(props, path=()):
+    """(path, value) for every scalar property of a trace, nested dicts flattened"""
+    for key, value in props.items():
+        if isinstance(value, dict):
+            yield from style_leaves(value, path + (key,))
+        elif path or key not in UNTEMPLATED_PROPS:
+            if not isinstance(value, (list, tuple, np.ndarray)):
+                yield path + (key,), value
+
+def hoist_shared_styles(fig_dict):
+    """
+    Move trace style values repeated across scatter traces (mode, line / marker settings, ...) into
+    layout.template.data.scatter, so each trace only keeps the values that differ. A property is
+    hoisted only when every scatter trace sets it, so no trace picks up a value it did not have.
+    Returns the number of trace properties removed.
+    """
+    traces = [trace for trace in fig_dict['data'] if trace.get('type') == 'scatter']
+    template_traces = fig_dict['layout'].setdefault('template', {}).setdefault('data', {}).setdefault('scatter', [{}])
+    if len(traces) < 2 or len(template_traces) != 1:
+        return 0
+    template_trace = template_traces[0]
+
+    values = {}
+    for trace in traces:
+        for path, value in style_leaves(trace):
+            values.setdefault(path, []).append(value)
+
+    removed = 0
+    for path, path_values in values.items():
+        if len(path_values) < len(traces):
+            continue
+        shared = pd.Series(path_values, dtype=object).value_counts()
+        if shared.iloc[0] < 2:
+            continue
+        value = shared.index[0]
+        target = template_trace
+        for key in path[:-1]:
+            target = target.setdefault(key, {})
+        if not isinstance(target, dict) or path[-1] in target:
+            continue
+        target[path[-1]] = value
+        for trace in traces:
+            parents = [trace]
+            for key in path[:-1]:
+                parents.append(parents[-1][key])
+            if type(parents[-1][path[-1]]) is type(value) and parents[-1][path[-1]] == value:
+                del parents[-1][path[-1]]
+                removed += 1
+                # Drop nested dicts emptied by the removal
+                for parent, key in zip(parents[-2::-1], path[-2::-1]):
+                    if parent[key]:
+                        break
+                    del parent[key]
+    return removed
+
+def compact_figure(fig, decimals=PAYLOAD_DECIMALS, dedupe=True):
+    """
+    Smaller figure dict for export: trace arrays named in decimals are rounded and stored as
+    typed arrays, repeated trace styles are hoisted into the template (dedupe=True), and
+    all numeric arrays are base64-encoded. Accepts a go.Figure, FigureSpec or figure dict.
+    """
+    fig_dict = figure_props(fig)
+    for trace in fig_dict['data']:
+        for key, places in decimals.items():
+            if isinstance(trace.get(key), (list, tuple, np.ndarray)):
+                trace[key] = compact_array(trace[key], places)
+    if dedupe:
+        hoist_shared_styles(fig_dict)
+    convert_to_base64(fig_dict)
+    return fig_dict
+
+def write_plotlyjs(directory):
+    """Write the plotly.min.js bundle that include_plotlyjs='directory' html files load, unless already there"""
+    path = os.path.join(directory or '.', 'plotly.min.js')
+    if not os.path.exists(path):
+        # Several render workers may get here at once: write to a private temp file and swap it in
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(get_plotlyjs())
+        os.replace(tmp_path, path)
+    return path
+
+def write_figure(fig, file, fmt='html', compact=False, compress=False, include_plotlyjs=True, **kwargs):
+    """
+    Write a go.Figure / FigureSpec / figure dict as html or json, optionally compacted (compact_figure)
+    and gzip-precompressed (written to file + '.gz'). Returns the path written.
+    include_plotlyjs='directory' loads plotly.js from a plotly.min.js written once next to the file.
+    """
+    fig_dict = compact_figure(fig) if compact else figure_props(fig)
+    if not compact:
+        convert_to_base64(fig_dict)
+    if fmt == 'html':
+        if include_plotlyjs == 'directory':
+            write_plotlyjs(os.path.dirname(file))
+        text = pio.to_html(fig_dict, include_plotlyjs=include_plotlyjs, validate=False, **kwargs)
+    elif fmt == 'json':
+        text = pio.to_json(fig_dict, validate=False, **kwargs)
+    else:
+        raise ValueError(f"Unsupported output format: {fmt}")
+    if compress:
+        file = f'{file}.gz'
+        with gzip.open(file, 'wt', encoding='utf-8') as f:
+            f.write(text)
+    else:
+        with open(file, 'w', encoding='utf-8') as f:
+            f.write(text)
+    return file
+
+def payload_report(fig):
+    """
+    JSON bytes per trace group (legendgroup, else trace name) and per layout part, largest first.
+    Pass the compact_figure output to see what an export actually carries.
+    """
+    fig_dict = figure_props(fig)
+    convert_to_base64(fig_dict)
+    size = lambda obj: len(json.dumps(obj, cls=PlotlyJSONEncoder))
+    rows = [dict(part='trace', group=trace.get('legendgroup') or trace.get('name') or '(unnamed)', traces=1, bytes=size(trace))
+            for trace in fig_dict['data']]
+    rows += [dict(part='layout', group=key, traces=0, bytes=size(value)) for key, value in fig_dict['layout'].items()]
+    report = pd.DataFrame(rows, columns=['part', 'group', 'traces', 'bytes'])
+    report = report.groupby(['part', 'group'], sort=False, as_index=False)[['traces', 'bytes']].sum()
+    report['share'] = report['bytes'] / report['bytes'].sum()
+    return report.sort_values('bytes', ascending=False, ignore_index=True)
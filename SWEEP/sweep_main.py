@@ -1,57 +1,79 @@
 from .sweep_viz import *
 from .sweep_data import *
+from .sweep_figure import write_figure, write_plotlyjs
+import os
+import time
+import hashlib
+import traceback
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 
-def get_visualization(season_data,the_week=None,the_team=None):
-    season_data_ = season_data.copy()
-    if the_week == None:
-        pass
-    else:
-        season_data_ = season_data_[season_data_['week']==the_week]
-    if the_team == None:
-        pass
-    else:
-        season_data_ = season_data_[(season_data_['home_team']==the_team)|(season_data_['away_team']==the_team)]
-    if len(season_data_[['game_id','week','home_team','away_team','week']].drop_duplicates()['game_id'])==0:
+### Version of the enrichment pipeline; bump it whenever make_sweep_data's output changes,
+### so memoized results computed by older code are never served
+SWEEP_PIPELINE_VERSION = '2'
+### In-memory LRU of make_sweep_data results, keyed by game content
+SWEEP_DATA_CACHE_SIZE = 32
+_SWEEP_DATA_CACHE = OrderedDict()
+_SWEEP_DATA_CACHE_STATS = dict(hits=0, misses=0, evictions=0)
+
+def get_visualization(season_data,the_week=None,the_team=None,use_cache=True):
+    # Find the game in the season's game catalog (built once per season frame)
+    games = find_games(game_catalog(season_data), the_week, the_team)
+    if len(games)==0:
         print("This game does not exist!")
         return None
-    elif len(season_data_[['game_id','week','home_team','away_team','week']].drop_duplicates()['game_id'])>1:
+    elif len(games)>1:
         print("This returns too many games, specify a team AND a week!") 
         return None
     else:
-        game_data = season_data_
+        game_id = games.index[0]
+        game_data,game_info = get_catalog_game(season_data,game_id,games)
         print("Preparing sweep analysis data for visualization.")
-        game_plays,home_team,away_team,game_date,season_type,is_playoff,ot_len = make_sweep_data(game_data)
+        enrich = cached_sweep_data if use_cache else make_sweep_data
+        game_plays,home_team,away_team,game_date,season_type,is_playoff,ot_len = enrich(game_data,game_info,'plotted')
         print("Generating visualization.")
         sweep_viz = run_sweep_viz(game_plays,home_team,away_team)
         sweep_viz.show()
-    game_id = game_plays['game_id'].iloc[0]
     return sweep_viz,game_id
 
-def run_sweep_viz(game_plays,home_team,away_team,home_color='#1f77b4',away_color='#ff7f0e'):
-    game_fig = create_viz(game_plays)
+def run_sweep_viz(game_plays,home_team,away_team,home_color='#1f77b4',away_color='#ff7f0e',consolidate=False,fast=False,
+                  hover='text'):
+    """
+    consolidate=True draws each team's drive lines and play markers with a few traces instead of two per play,
+    and all kickoff / turnover lines in one trace each.
+    fast=True assembles the figure as a plain-dict FigureSpec (same JSON, no graph_objects validation);
+    write it with write_html / write_json / to_json, or call to_figure() for a go.Figure.
+    hover='template' sends per-play hover fields as customdata formatted by one shared hovertemplate
+    instead of a hover_text string per play (game_plays then need no 'hover_text' column); it pays off
+    with consolidate=True, where each trace holds many plays.
+    """
+    game_fig = create_viz(game_plays,fast)
+    
+    # Masks and row subsets shared by every add_* step, computed once for the game
+    context = build_render_context(game_plays,hover)
 
     ### Add probability/margin plots
     game_fig = viz_probability(game_plays,home_team,game_fig)
     
     ### Core drive visualizations by team
-    game_fig = add_team_traces(game_fig,game_plays, home_team,home_color,True)
-    game_fig = add_team_traces(game_fig,game_plays, away_team,away_color,False)
+    game_fig = add_team_traces(game_fig,game_plays, home_team,home_color,True,consolidate,context)
+    game_fig = add_team_traces(game_fig,game_plays, away_team,away_color,False,consolidate,context)
     
     ### Add Events for Each Team: Scores, Turnovers, First Downs, Drive Starts, etc.
-    game_fig = add_team_events(game_fig,game_plays, home_team, home_color,True)
-    game_fig = add_team_events(game_fig,game_plays, away_team, away_color,False)
+    game_fig = add_team_events(game_fig,game_plays, home_team, home_color,True,context)
+    game_fig = add_team_events(game_fig,game_plays, away_team, away_color,False,context)
     
     ### Add Extra Point Data
-    game_fig = add_score_details(game_fig,game_plays, home_team, home_color,True)
-    game_fig = add_score_details(game_fig,game_plays, away_team, away_color,False)
+    game_fig = add_score_details(game_fig,game_plays, home_team, home_color,True,context)
+    game_fig = add_score_details(game_fig,game_plays, away_team, away_color,False,context)
     
     ### Add possession change events:
-    game_fig = add_kicks(game_fig,game_plays)
-    game_fig = add_turnovers(game_fig,game_plays)
+    game_fig = add_kicks(game_fig,game_plays,consolidate,context)
+    game_fig = add_turnovers(game_fig,game_plays,consolidate,context)
     
     ### Add Scoring Labels and Descriptive Tables
-    game_fig = add_score_labels(game_fig,game_plays,home_color,away_color)
-    game_fig = add_game_table(game_fig,game_plays)
+    game_fig = add_score_labels(game_fig,game_plays,home_color,away_color,context)
+    game_fig = add_game_table(game_fig,game_plays,context)
     game_fig = add_exciting_table(game_fig,game_plays)
     
     
@@ -62,9 +84,16 @@ def run_sweep_viz(game_plays,home_team,away_team,home_color='#1f77b4',away_color
     return game_fig
 
 
-def make_sweep_data(game_plays): 
-    ### 1. Get Game Overall Stats
-    home_team,away_team,game_date,season_type,is_playoff,ot_len = get_game_info(game_plays)
+def make_sweep_data(game_plays,game_info=None,hover_text=True,drives=False): 
+    """
+    Enrich one game's plays with every SWEEP column. Returns (game_plays, home_team, away_team,
+    game_date, season_type, is_playoff, ot_len), plus the game's drive table (build_drive_table)
+    as a last element with drives=True.
+    """
+    ### 1. Get Game Overall Stats (or take them from the season's game catalog)
+    if game_info is None:
+        game_info = get_game_info(game_plays)
+    home_team,away_team,game_date,season_type,is_playoff,ot_len = game_info
     
     ### 2. Eliminate Period End/Timeout Events
     game_plays = filter_non_plays(game_plays)
@@ -82,6 +111,172 @@ def make_sweep_data(game_plays):
     game_plays = calculate_excitement(game_plays,home_team)
     
     ### 7. Make Final Additions to Data Before Visualizations. (Adds columns 'yards_gained_display' and 'hover_text' )
-    game_plays = create_final_display_data(game_plays)
+    game_plays = create_final_display_data(game_plays,hover_text)
+    
+    ### 8. Drive line segment endpoints for every drive play. (Adds columns 'segment_x0/x1/y0/y1' and 'has_segment')
+    game_plays = add_drive_segments(game_plays)
+    
+    if drives:
+        return game_plays,home_team,away_team,game_date,season_type,is_playoff,ot_len,build_drive_table(game_plays)
+    return game_plays,home_team,away_team,game_date,season_type,is_playoff,ot_len
+
+
+def game_content_hash(game_plays):
+    """Digest of a game's raw rows (values, index, column names and dtypes): changes whenever the upstream data does"""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(repr([(str(col), str(dtype)) for col, dtype in game_plays.dtypes.items()]).encode())
+    digest.update(pd.util.hash_pandas_object(game_plays, index=True).to_numpy().tobytes())
+    return digest.hexdigest()
+
+def sweep_data_key(game_plays,game_info=None,hover_text=True,drives=False):
+    """Memo key of a make_sweep_data call: game_id, content hash, pipeline version and options"""
+    game_id = game_plays['game_id'].iloc[0] if 'game_id' in game_plays.columns and len(game_plays) else None
+    info = None if game_info is None else tuple(game_info)
+    return (game_id, game_content_hash(game_plays), SWEEP_PIPELINE_VERSION, info, hover_text, drives)
+
+def cached_sweep_data(game_plays,game_info=None,hover_text=True,drives=False,maxsize=None):
+    """
+    make_sweep_data memoized in an in-memory LRU of up to maxsize games (SWEEP_DATA_CACHE_SIZE).
+    Entries are keyed by sweep_data_key, so changed rows or a new SWEEP_PIPELINE_VERSION are
+    re-enriched. Returns the same tuple as make_sweep_data, with frames copied so callers may modify them.
+    """
+    maxsize = SWEEP_DATA_CACHE_SIZE if maxsize is None else maxsize
+    key = sweep_data_key(game_plays,game_info,hover_text,drives)
+    result = _SWEEP_DATA_CACHE.get(key)
+    if result is not None:
+        _SWEEP_DATA_CACHE.move_to_end(key)
+        _SWEEP_DATA_CACHE_STATS['hits'] += 1
+    else:
+        _SWEEP_DATA_CACHE_STATS['misses'] += 1
+        result = make_sweep_data(game_plays.copy(),game_info,hover_text,drives)
+        _SWEEP_DATA_CACHE[key] = result
+        while len(_SWEEP_DATA_CACHE) > max(maxsize, 0):
+            _SWEEP_DATA_CACHE.popitem(last=False)
+            _SWEEP_DATA_CACHE_STATS['evictions'] += 1
+    return tuple(value.copy() if isinstance(value, pd.DataFrame) else value for value in result)
+
+def sweep_data_cache_info():
+    """Hit / miss / eviction counts and current size of the cached_sweep_data LRU"""
+    return dict(_SWEEP_DATA_CACHE_STATS, size=len(_SWEEP_DATA_CACHE), maxsize=SWEEP_DATA_CACHE_SIZE)
+
+def clear_sweep_data_cache():
+    """Drop every memoized make_sweep_data result and reset the counters"""
+    _SWEEP_DATA_CACHE.clear()
+    _SWEEP_DATA_CACHE_STATS.update(hits=0, misses=0, evictions=0)
+
+
+def make_sweep_season(season_plays,hover_text=True,drives=False):
+    """
+    Season-wide make_sweep_data: adds every SWEEP column for all games in one pass.
+    Shifts and fills run within each game_id, so each game's rows match make_sweep_data
+    on that game alone. Returns (season_plays, game catalog), plus the season's drive table
+    with drives=True.
+    """
+    ### 1. Get Game Overall Stats for every game from the season's game catalog
+    catalog = game_catalog(season_plays)
+    
+    ### 2. Eliminate Period End/Timeout Events
+    season_plays = filter_non_plays(season_plays)
+    
+    # Per-row home team and OT length of each play's game
+    game_rows = catalog.index.get_indexer(season_plays['game_id'].to_numpy(dtype=object))
+    home_team = catalog['home_team'].to_numpy(dtype=object)[game_rows]
+    ot_len = catalog['ot_len'].to_numpy()[game_rows]
+    
+    ### 3. Add columns for time and yard and score differntial data
+    season_plays = enhance_time_and_field(season_plays,ot_len,home_team)
+    
+    ### 4. Label and categorize different game events (Adds columns 'play_category','special_outcome')
+    season_plays = categorize_game_data(season_plays)
+    
+    ### 5. labels 1st Dowsns and Drive Starts. (Adds columns 'is_drive_start','is_first_down')
+    season_plays = label_drives_firsts(season_plays)
+    
+    ### 6. Calcualte excitement via change in win probability. (Adds columns 'play_excitement' and support columns )
+    season_plays = calculate_excitement(season_plays,home_team)
+    
+    ### 7. Make Final Additions to Data Before Visualizations. (Adds columns 'yards_gained_display' and 'hover_text' )
+    season_plays = create_final_display_data(season_plays,hover_text)
+    
+    ### 8. Drive line segment endpoints for every drive play. (Adds columns 'segment_x0/x1/y0/y1' and 'has_segment')
+    season_plays = add_drive_segments(season_plays)
     
-    return game_plays,home_team,away_team,game_date,season_type,is_playoff,ot_len
\ No newline at end of file
+    if drives:
+        return season_plays,catalog,build_drive_table(season_plays)
+    return season_plays,catalog
+
+
+
+def render_game_task(task):
+    """
+    Process pool entry point: enrich and draw one game, writing its outputs.
+    task is (game_id, game_plays, game_info, output_dir, formats, viz_options, export_options),
+    viz_options being keyword arguments for run_sweep_viz and export_options for write_figure.
+    Returns a report dict; errors are caught and reported rather than raised.
+    """
+    game_id,game_plays,game_info,output_dir,formats,viz_options,export_options = task
+    start = time.perf_counter()
+    report = dict(game_id=game_id, plays=len(game_plays), error=None)
+    try:
+        hover_text = viz_options.get('hover', 'text') == 'text'
+        game_plays,home_team,away_team,game_date,season_type,is_playoff,ot_len = make_sweep_data(game_plays,game_info,hover_text)
+        report['enrich_s'] = time.perf_counter() - start
+        sweep_viz = run_sweep_viz(game_plays,home_team,away_team,**viz_options)
+        report['render_s'] = time.perf_counter() - start - report['enrich_s']
+        for fmt in formats:
+            path = os.path.join(output_dir, f'sweep_viz_{game_id}.{fmt}')
+            path = write_figure(sweep_viz, path, fmt, **export_options)
+            report[fmt] = path
+            report[f'{fmt}_bytes'] = os.path.getsize(path)
+    except Exception as e:
+        report['error'] = f"{type(e).__name__}: {e}"
+        report['traceback'] = traceback.format_exc()
+    report['total_s'] = time.perf_counter() - start
+    return report
+
+def render_games(season_data,output_dir,the_week=None,the_team=None,game_ids=None,formats=('html',),
+                 max_workers=None,chunksize=1,include_plotlyjs='directory',compact=False,compress=False,**viz_options):
+    """
+    Render every game in a season (or a week / team / list of game_ids) across a process pool.
+    Each worker receives only its game's rows, runs make_sweep_data + run_sweep_viz and writes
+    sweep_viz_{game_id}.html / .json to output_dir. viz_options (home_color, away_color,
+    consolidate, fast, hover, ...) are passed on to run_sweep_viz; consolidated traces, the dict-based
+    figure builder and template hovers are the defaults here. compact=True writes rounded typed arrays with shared trace
+    styles hoisted into the template, compress=True writes gzip-precompressed .html.gz / .json.gz files.
+    html files load plotly.js from one plotly.min.js written to output_dir (include_plotlyjs='directory')
+    instead of embedding the ~4.5MB bundle in every game; pass include_plotlyjs=True for standalone files
+    or 'cdn' to load it from the plotly CDN.
+    Returns a DataFrame with per-game timing, output sizes and errors.
+    """
+    viz_options.setdefault('consolidate', True)
+    viz_options.setdefault('fast', True)
+    viz_options.setdefault('hover', 'template')
+    catalog = game_catalog(season_data)
+    games = find_games(catalog, the_week, the_team)
+    if game_ids is not None:
+        games = games[games.index.isin(game_ids)]
+    if len(games) == 0:
+        print("No games to render!")
+        return pd.DataFrame()
+    os.makedirs(output_dir, exist_ok=True)
+    export_options = dict(compact=compact, compress=compress, include_plotlyjs=include_plotlyjs)
+    if include_plotlyjs == 'directory' and 'html' in formats:
+        write_plotlyjs(output_dir)
+
+    def tasks():
+        for game_id in games.index:
+            game_plays,game_info = get_catalog_game(season_data,game_id,games)
+            yield (game_id,game_plays,game_info,output_dir,tuple(formats),viz_options,export_options)
+
+    print(f"Rendering {len(games)} games...")
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        reports = list(pool.map(render_game_task, tasks(), chunksize=chunksize))
+    elapsed = time.perf_counter() - start
+
+    report = pd.DataFrame(reports).set_index('game_id')
+    failed = report['error'].notna()
+    print(f"✓ Rendered {(~failed).sum()} games in {elapsed:.1f}s ({report['total_s'].sum():.1f}s of worker time)")
+    for game_id, error in report.loc[failed, 'error'].items():
+        print(f"✗ {game_id}: {error}")
+    return report
@@ -0,0 +1,176 @@
+import os
+import json
+import numbers
+import time
+import traceback
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from .sweep_data import game_catalog, find_games, get_catalog_game, DRIVE_SEGMENT_COLUMNS
+from .sweep_main import make_sweep_data, run_sweep_viz, game_content_hash, SWEEP_PIPELINE_VERSION
+from .sweep_download import SEASON_CACHE_DIR, download_nfl_data_season
+
+# ============================================================================
+# Persistent store of enriched games: {store_dir}/v{pipeline version}/season=YYYY/week=WW/{game_id}.parquet
+# ============================================================================
+SWEEP_STORE_DIR = os.environ.get('SWEEP_STORE_DIR', os.path.join(SEASON_CACHE_DIR, 'enriched'))
+
+### Enriched columns run_sweep_viz and its tables read (both hover modes); everything else is not stored
+STORE_COLUMNS = [
+    # Game and play identifiers
+    'game_id', 'season', 'week', 'play_id', 'home_team', 'away_team', 'posteam', 'defteam', 'td_team',
+    'game_date', 'season_type',
+    # Clock, down and field
+    'qtr', 'time', 'down', 'ydstogo', 'yrdln', 'drive', 'time_elapsed_min', 'next_time_elapsed_min',
+    'field_position', 'play_type', 'yards_gained', 'yards_gained_display', 'penalty', 'penalty_yards',
+    # Score and win probability
+    'total_home_score', 'total_away_score', 'home_score', 'away_score', 'score_margin', 'wp', 'vegas_wp', 'home_wp',
+    'home_vegas_wp', 'home_model_wp', 'play_excitement', 'play_unpredictability', 'is_real_play',
+    # Play labels
+    'play_category', 'special_outcome', 'is_drive_start', 'is_first_down', 'extra_point_result',
+    'two_point_conv_result', *DRIVE_SEGMENT_COLUMNS,
+    # Text
+    'desc', 'hover_text',
+]
+GAME_INFO_FIELDS = ['home_team', 'away_team', 'game_date', 'season_type', 'is_playoff', 'ot_len']
+
+def game_partition(game_plays=None, game_id=None):
+    """(season, week) of a game from its season / week columns, else from the nflverse game_id (YYYY_WW_AWAY_HOME)"""
+    if game_plays is not None and {'season', 'week'}.issubset(game_plays.columns) and len(game_plays):
+        return int(game_plays['season'].iloc[0]), int(game_plays['week'].iloc[0])
+    if game_id is None:
+        game_id = game_plays['game_id'].iloc[0]
+    season, week = str(game_id).split('_')[:2]
+    return int(season), int(week)
+
+def enriched_game_paths(game_id, season, week, store_dir=None, version=SWEEP_PIPELINE_VERSION):
+    """Return the (data, metadata) file paths of a stored enriched game"""
+    store_dir = store_dir or SWEEP_STORE_DIR
+    partition = os.path.join(store_dir, f"v{version}", f"season={season}", f"week={week:02d}")
+    return os.path.join(partition, f"{game_id}.parquet"), os.path.join(partition, f"{game_id}.json")
+
+def save_enriched_game(game_plays, game_info, raw_hash=None, store_dir=None):
+    """
+    Write one make_sweep_data result (STORE_COLUMNS only) and its game info to the store.
+    raw_hash (game_content_hash of the raw rows) is kept so stale entries can be detected.
+    """
+    game_id = game_plays['game_id'].iloc[0]
+    season, week = game_partition(game_plays)
+    data_path, meta_path = enriched_game_paths(game_id, season, week, store_dir)
+    os.makedirs(os.path.dirname(data_path), exist_ok=True)
+
+    # Write to a temp file first so a crash never leaves a half-written game behind
+    columns = [col for col in STORE_COLUMNS if col in game_plays.columns]
+    tmp_path = data_path + '.tmp'
+    try:
+        game_plays[columns].to_parquet(tmp_path)
+    except Exception as e:
+        print(f"✗ Could not store {game_id}: {e}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return None
+    os.replace(tmp_path, data_path)
+
+    meta = dict(zip(GAME_INFO_FIELDS, (value.item() if hasattr(value, 'item') else value for value in game_info)))
+    meta.update(game_id=game_id, season=season, week=week, pipeline_version=SWEEP_PIPELINE_VERSION,
+                raw_hash=raw_hash, rows=len(game_plays), columns=columns, stored_at=time.time())
+    with open(meta_path, 'w') as f:
+        json.dump(meta, f)
+    return data_path
+
+def read_enriched_game_meta(game_id, season=None, week=None, store_dir=None):
+    """Return the stored metadata of an enriched game (empty dict if not stored)"""
+    if season is None or week is None:
+        season, week = game_partition(game_id=game_id)
+    data_path, meta_path = enriched_game_paths(game_id, season, week, store_dir)
+    if not os.path.exists(meta_path):
+        return {}
+    with open(meta_path) as f:
+        return json.load(f)
+
+def load_enriched_game(game_id, season=None, week=None, store_dir=None):
+    """
+    Load a stored game as make_sweep_data returns it: (game_plays, home_team, away_team, game_date,
+    season_type, is_playoff, ot_len), or None if the game is not stored for this pipeline version
+    """
+    if season is None or week is None:
+        season, week = game_partition(game_id=game_id)
+    data_path, meta_path = enriched_game_paths(game_id, season, week, store_dir)
+    if not (os.path.exists(data_path) and os.path.exists(meta_path)):
+        return None
+    try:
+        game_plays = pd.read_parquet(data_path)
+    except Exception as e:
+        print(f"✗ Stored {game_id} unreadable ({e}), ignoring it")
+        return None
+    meta = read_enriched_game_meta(game_id, season, week, store_dir)
+    return (game_plays, *(meta[field] for field in GAME_INFO_FIELDS))
+
+def stored_sweep_viz(game_id, store_dir=None, **viz_options):
+    """run_sweep_viz on a stored game, with no download or enrichment; None if the game is not stored"""
+    stored = load_enriched_game(game_id, store_dir=store_dir)
+    if stored is None:
+        print(f"✗ {game_id} is not in the store (pipeline v{SWEEP_PIPELINE_VERSION}), run materialize_season first")
+        return None
+    game_plays,home_team,away_team,game_date,season_type,is_playoff,ot_len = stored
+    return run_sweep_viz(game_plays,home_team,away_team,**viz_options)
+
+def materialize_game_task(task):
+    """
+    Process pool entry point: enrich one game and write it to the store, unless it is already
+    stored from the same raw rows (overwrite=True rewrites it). Returns a report dict.
+    """
+    game_id,game_plays,game_info,store_dir,overwrite = task
+    start = time.perf_counter()
+    report = dict(game_id=game_id, plays=len(game_plays), stored=False, skipped=False, error=None)
+    try:
+        raw_hash = game_content_hash(game_plays)
+        season, week = game_partition(game_plays)
+        if not overwrite and read_enriched_game_meta(game_id, season, week, store_dir).get('raw_hash') == raw_hash:
+            report['skipped'] = True
+        else:
+            game_plays = make_sweep_data(game_plays,game_info,'plotted')[0]
+            report['path'] = save_enriched_game(game_plays, game_info, raw_hash, store_dir)
+            report['stored'] = report['path'] is not None
+    except Exception as e:
+        report['error'] = f"{type(e).__name__}: {e}"
+        report['traceback'] = traceback.format_exc()
+    report['total_s'] = time.perf_counter() - start
+    return report
+
+def materialize_season(season_data, store_dir=None, the_week=None, the_team=None, overwrite=False,
+                       max_workers=None, chunksize=4):
+    """
+    Fill the store with every game of a season (or a week / team) across a process pool.
+    season_data is a play-by-play frame or a season year (loaded with download_nfl_data_season,
+    so from the season cache when available). Games already stored from the same raw rows are skipped.
+    Returns a DataFrame with a per-game report.
+    """
+    if isinstance(season_data, numbers.Integral):
+        season = int(season_data)
+        season_data = download_nfl_data_season(season)
+        if season_data is None:
+            print(f"✗ Could not load the {season} season, nothing to materialize")
+            return pd.DataFrame()
+    games = find_games(game_catalog(season_data), the_week, the_team)
+    if len(games) == 0:
+        print("No games to materialize!")
+        return pd.DataFrame()
+    store_dir = store_dir or SWEEP_STORE_DIR
+
+    def tasks():
+        for game_id in games.index:
+            game_plays,game_info = get_catalog_game(season_data,game_id,games)
+            yield (game_id,game_plays,game_info,store_dir,overwrite)
+
+    print(f"Materializing {len(games)} games to {store_dir}...")
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        reports = list(pool.map(materialize_game_task, tasks(), chunksize=chunksize))
+    elapsed = time.perf_counter() - start
+
+    report = pd.DataFrame(reports).set_index('game_id')
+    failed = report['error'].notna()
+    print(f"✓ Stored {report['stored'].sum()} games, {report['skipped'].sum()} already stored, in {elapsed:.1f}s")
+    for game_id, error in report.loc[failed, 'error'].items():
+        print(f"✗ {game_id}: {error}")
+    return report
@@ -2,14 +2,145 @@ import pandas as pd
 import numpy as np
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
+from .sweep_data import (home_perspective_wp, HOME_WP_COLUMNS, DRIVE_PLAY_CATEGORIES, create_hover_data, hover_template,
+                         game_summary, add_drive_segments, DRIVE_SEGMENT_COLUMNS)
+from .sweep_figure import FigureSpec
 
-def create_viz(game_plays):
-    
-    fig = go.Figure()
+# ============================================================================
+# Render context: masks and row groups every add_* function reads, each built at most once per game
+# ============================================================================
+EXTRA_POINT_RESULTS = {
+    'xp_made': ('extra_point_result', ['good']),
+    'xp_failed': ('extra_point_result', ['failed', 'blocked', 'missed']),
+    '2pt_made': ('two_point_conv_result', ['success']),
+    '2pt_failed': ('two_point_conv_result', ['failure']),
+}
+
+def split_by(rows, *keys):
+    """
+    Subsets of rows keyed by the key value (one key) or a tuple of values (several keys), from one
+    groupby per family of subsets instead of a rescan per team / outcome
+    """
+    if len(rows) == 0:
+        return {}
+    keys = [np.asarray(key, dtype=object) for key in keys]
+    groups = pd.Series(np.arange(len(rows))).groupby(keys if len(keys) > 1 else keys[0], sort=False).indices
+    return {key: rows.iloc[positions] for key, positions in groups.items()}
+
+def context_valid_plays(game_plays, context):
+    return game_plays[game_plays['field_position'].notna() &
+                      game_plays['play_category'].isin(DRIVE_PLAY_CATEGORIES)]
+
+def context_team_plays(game_plays, context):
+    drive_plays = context['valid_plays'][context['valid_plays']['down'] > 0]
+    return split_by(drive_plays, drive_plays['posteam'])
+
+def context_drive_starts(game_plays, context):
+    drive_starts = context['valid_plays'][context['valid_plays']['is_drive_start'] == True]
+    return split_by(drive_starts, drive_starts['posteam'])
+
+def context_first_downs(game_plays, context):
+    first_downs = context['valid_plays'][context['valid_plays']['is_first_down'] == True]
+    return split_by(first_downs, first_downs['posteam'])
+
+def context_outcomes(game_plays, context):
+    # Touchdowns belong to td_team when available (handles defensive TDs), everything else to posteam
+    outcome_plays = game_plays[game_plays['special_outcome'].notna()]
+    outcome_team = outcome_plays['posteam'].astype(object)
+    if 'td_team' in outcome_plays.columns:
+        is_touchdown = outcome_plays['special_outcome'] == 'touchdown'
+        outcome_team = outcome_team.where(~is_touchdown, outcome_plays['td_team'].astype(object))
+    return split_by(outcome_plays, outcome_team, outcome_plays['special_outcome'])
+
+def context_extra_points(game_plays, context):
+    extra_points = {}
+    for kind, (result_col, results) in EXTRA_POINT_RESULTS.items():
+        attempts = game_plays[game_plays[result_col].isin(results)]
+        for team, rows in split_by(attempts, attempts['posteam']).items():
+            extra_points[(team, kind)] = rows
+    return extra_points
+
+### How each render context entry is built from the game's plays (and earlier entries)
+RENDER_CONTEXT_BUILDERS = {
+    'valid_plays': context_valid_plays,
+    'team_plays': context_team_plays,
+    'drive_starts': context_drive_starts,
+    'first_downs': context_first_downs,
+    'outcomes': context_outcomes,
+    'extra_points': context_extra_points,
+    'kickoffs': lambda game_plays, context: game_plays[game_plays['play_category'] == 'kickoff'],
+    'turnovers': lambda game_plays, context: game_plays[
+        game_plays['special_outcome'].isin(['interception', 'fumble_lost', 'turnover_on_downs'])],
+    'scoring_plays': lambda game_plays, context: game_plays[
+        game_plays['special_outcome'].isin(['touchdown', 'field_goal_made'])],
+    'game_summary': lambda game_plays, context: game_summary(game_plays).iloc[0],
+    'hovertemplate': lambda game_plays, context: hover_template(context['home_team'], context['away_team']),
+}
+
+class RenderContext(dict):
+    """Render context dict whose RENDER_CONTEXT_BUILDERS entries are built on first access, then kept"""
+    def __init__(self, game_plays, **entries):
+        super().__init__(**entries)
+        self.game_plays = game_plays
+
+    def __missing__(self, key):
+        if key not in RENDER_CONTEXT_BUILDERS:
+            raise KeyError(key)
+        self[key] = RENDER_CONTEXT_BUILDERS[key](self.game_plays, self)
+        return self[key]
+
+def build_render_context(game_plays,hover='text'):
+    """
+    Render context for one game: the row subsets the figure functions draw from, built lazily so
+    each caller only pays for the subsets it reads (see RENDER_CONTEXT_BUILDERS): drive plays,
+    drive starts and first downs per team, special outcome plays per (team, outcome) (td_team for
+    touchdowns), extra point / 2PT attempts per (team, result), kickoffs, turnovers, scoring plays
+    and the game_summary row behind the game table. Subsets keep the game's row order and are not copied.
+    hover='text' shows each play's hover_text string, hover='template' sends compact customdata
+    formatted by one shared hovertemplate (see play_hover).
+    """
+    if hover not in ('text', 'template'):
+        raise ValueError(f"Unknown hover mode: {hover}")
+    return RenderContext(
+        game_plays,
+        home_team=game_plays['home_team'].iloc[0],
+        away_team=game_plays['away_team'].iloc[0],
+        hover=hover,
+        empty=game_plays.iloc[0:0],
+    )
+
+def context_rows(context,family,key):
+    """Rows of one precomputed subset (empty frame if that team / outcome has none)"""
+    return context[family].get(key, context['empty'])
+
+def play_hover(plays,context=None):
+    """Hover properties for a trace of plays: their hover_text strings, or customdata + the shared template"""
+    if context is not None and context['hover'] == 'template':
+        return dict(customdata=create_hover_data(plays).to_numpy(dtype=object),
+                    hovertemplate=context['hovertemplate'])
+    return dict(hovertext=plays['hover_text'], hovertemplate='%{hovertext}<extra></extra>')
+
+def create_viz(game_plays,fast=False):
+    """Empty figure: a go.Figure, or with fast=True a dict-based FigureSpec that skips graph_objects validation"""
+    fig = FigureSpec() if fast else go.Figure()
 
     return fig
 
 
+def home_wp_for_plot(game_plays,wp_column,home_team):
+    """
+    Plays with a home-perspective WP for wp_column, sorted by time.
+    Reads the home-perspective column precomputed by add_home_perspective when present.
+    """
+    home_column = HOME_WP_COLUMNS[wp_column]
+    if home_column in game_plays.columns:
+        plays = game_plays[['time_elapsed_min', home_column]].dropna()
+        plays = plays.rename(columns={home_column: 'home_wp'})
+    else:
+        plays = game_plays[['time_elapsed_min', wp_column, 'posteam']].dropna()
+        plays = plays.assign(home_wp=home_perspective_wp(plays[wp_column],plays['posteam'],home_team))
+    return plays.sort_values('time_elapsed_min').reset_index(drop=True)
+
 def viz_probability(game_plays,home_team,fig):
     """Add probability and margin traces to figure"""
     # Define colors for each team
@@ -19,84 +150,66 @@ def viz_probability(game_plays,home_team,fig):
     wp_column = 'vegas_wp' if 'vegas_wp' in game_plays.columns else 'wp'
     
     if wp_column in game_plays.columns:
-        all_plays_for_wp = game_plays[['time_elapsed_min', wp_column, 'posteam']].dropna().copy()
-        all_plays_for_wp = all_plays_for_wp.sort_values('time_elapsed_min').reset_index(drop=True)
-        
-        # Convert WP to always be from home team perspective
+        # WP always from home team perspective
         # If away team has possession, wp is their win prob, so home wp = 1 - wp
-        all_plays_for_wp['home_wp'] = all_plays_for_wp.apply(
-            lambda row: row[wp_column] if row['posteam'] == home_team else 1 - row[wp_column],
-            axis=1
-        )
+        all_plays_for_wp = home_wp_for_plot(game_plays,wp_column,home_team)
         
         # Convert WP from 0-1 to -50 to +50 scale (matching field position)
         # 0% home WP (away wins) = -50, 50% = 0, 100% (home wins) = +50
         all_plays_for_wp['wp_scaled'] = (all_plays_for_wp['home_wp'] - 0.5) * 100
         
-        fig.add_trace(
-            go.Scatter(
-                x=all_plays_for_wp['wp_scaled'],
-                y=all_plays_for_wp['time_elapsed_min'],
-                fill='tozerox',  # Fill to x=0 (50/50 game)
-                fillcolor='rgba(100, 150, 200, 0.08)',  # Light blue, very transparent
-                line=dict(color='rgba(80, 120, 180, 0.3)', width=2),
-                mode='lines',
-                name=f'{home_team} Win Prob (Vegas)',
-                customdata=all_plays_for_wp['home_wp'] * 100,  # Store actual percentage
-                hovertemplate='<b>Win Prob (Vegas)</b>: %{customdata:.1f}%<br><b>Time</b>: %{y:.1f} min<extra></extra>',
-                showlegend=True,
-                legendrank=500  # Background traces at bottom
-            )
+        fig.add_scatter(
+            x=all_plays_for_wp['wp_scaled'],
+            y=all_plays_for_wp['time_elapsed_min'],
+            fill='tozerox',  # Fill to x=0 (50/50 game)
+            fillcolor='rgba(100, 150, 200, 0.08)',  # Light blue, very transparent
+            line=dict(color='rgba(80, 120, 180, 0.3)', width=2),
+            mode='lines',
+            name=f'{home_team} Win Prob (Vegas)',
+            customdata=all_plays_for_wp['home_wp'] * 100,  # Store actual percentage
+            hovertemplate='<b>Win Prob (Vegas)</b>: %{customdata:.1f}%<br><b>Time</b>: %{y:.1f} min<extra></extra>',
+            showlegend=True,
+            legendrank=500  # Background traces at bottom
         )
     
     # Add model-based WP trace (if wp column exists separately from vegas_wp)
     if 'wp' in game_plays.columns and wp_column == 'vegas_wp':
-        all_plays_for_model_wp = game_plays[['time_elapsed_min', 'wp', 'posteam']].dropna().copy()
-        all_plays_for_model_wp = all_plays_for_model_wp.sort_values('time_elapsed_min').reset_index(drop=True)
-        
-        # Convert model WP to home team perspective (same logic)
-        all_plays_for_model_wp['home_wp'] = all_plays_for_model_wp.apply(
-            lambda row: row['wp'] if row['posteam'] == home_team else 1 - row['wp'],
-            axis=1
-        )
+        # Model WP in home team perspective (same logic)
+        all_plays_for_model_wp = home_wp_for_plot(game_plays,'wp',home_team)
         
         # Scale to field position range
         all_plays_for_model_wp['wp_scaled'] = (all_plays_for_model_wp['home_wp'] - 0.5) * 100
         
-        fig.add_trace(
-            go.Scatter(
-                x=all_plays_for_model_wp['wp_scaled'],
-                y=all_plays_for_model_wp['time_elapsed_min'],
-                fill='tozerox',  # Fill to x=0 (50/50 game)
-                fillcolor='rgba(200, 100, 150, 0.05)',  # Light purple/pink, very transparent
-                line=dict(color='rgba(180, 80, 120, 0.3)', width=2, dash='dot'),
-                mode='lines',
-                name=f'{home_team} Win Prob (Model)',
-                customdata=all_plays_for_model_wp['home_wp'] * 100,
-                hovertemplate='<b>Win Prob (Model)</b>: %{customdata:.1f}%<br><b>Time</b>: %{y:.1f} min<extra></extra>',
-                visible='legendonly',  # Hidden by default, can toggle on
-                showlegend=True,
-                legendrank=501  # Background traces at bottom
-            )
+        fig.add_scatter(
+            x=all_plays_for_model_wp['wp_scaled'],
+            y=all_plays_for_model_wp['time_elapsed_min'],
+            fill='tozerox',  # Fill to x=0 (50/50 game)
+            fillcolor='rgba(200, 100, 150, 0.05)',  # Light purple/pink, very transparent
+            line=dict(color='rgba(180, 80, 120, 0.3)', width=2, dash='dot'),
+            mode='lines',
+            name=f'{home_team} Win Prob (Model)',
+            customdata=all_plays_for_model_wp['home_wp'] * 100,
+            hovertemplate='<b>Win Prob (Model)</b>: %{customdata:.1f}%<br><b>Time</b>: %{y:.1f} min<extra></extra>',
+            visible='legendonly',  # Hidden by default, can toggle on
+            showlegend=True,
+            legendrank=501  # Background traces at bottom
         )
     
     # Score Margin (always show this)
     all_plays_for_score = game_plays[['time_elapsed_min', 'score_margin']].dropna().copy()
     all_plays_for_score = all_plays_for_score.sort_values('time_elapsed_min').reset_index(drop=True)
     
-    fig.add_trace(
-        go.Scatter(
-            x=all_plays_for_score['score_margin'],
-            y=all_plays_for_score['time_elapsed_min'],
-            fill='tozerox',
-            fillcolor='rgba(200, 200, 200, 0.12)',  # Light gray
-            line=dict(color='rgba(100, 100, 100, 0.3)', width=1.5),
-            mode='lines',
-            name='Score Margin (Home - Away)',
-            hovertemplate='<b>Margin</b>: %{x}<br><b>Time</b>: %{y:.1f} min<extra></extra>',
-            showlegend=True,
-            legendrank=502  # Background traces at bottom
-        )
+    fig.add_scatter(
+        x=all_plays_for_score['score_margin'],
+        y=all_plays_for_score['time_elapsed_min'],
+        fill='tozerox',
+        fillcolor='rgba(200, 200, 200, 0.12)',  # Light gray
+        line=dict(color='rgba(100, 100, 100, 0.3)', width=1.5),
+        mode='lines',
+        name='Score Margin (Home - Away)',
+        hovertemplate='<b>Margin</b>: %{x}<br><b>Time</b>: %{y:.1f} min<extra></extra>',
+        showlegend=True,
+        legendrank=502  # Background traces at bottom
     )
     return fig
 
@@ -106,85 +219,111 @@ def viz_probability(game_plays,home_team,fig):
 
 #game_plays['next_time_elapsed_min'] = game_plays['time_elapsed_min'].shift(-1)
 
+# Line/marker style for each drive play category: (line dash, marker symbol, marker line color, legend group suffix)
+# A marker line color of None means the team color.
+TEAM_PLAY_STYLES = {
+    'run': ('solid', 'circle', 'white', 'run'),
+    'pass': ('dot', 'circle-open', None, 'pass'),
+    'penalty': ('dot', 'triangle-up', None, 'penalty'),
+    'punt': ('dashdot', 'circle-open', 'gray', 'other'),
+}
+
+def team_drive_segments(team_plays):
+    """
+    A team's drive plays in drive / play order with the segment endpoints make_sweep_data precomputes
+    (add_drive_segments: segment_x0/x1/y0/y1, has_segment), computed here when they are missing.
+    """
+    plays = team_plays[team_plays['drive'].notna()].sort_values(['drive', 'play_id'])
+    if not set(DRIVE_SEGMENT_COLUMNS).issubset(plays.columns):
+        plays = add_drive_segments(plays.copy())
+    return plays
+
+def separated(starts, ends):
+    """Interleave segment start/end points with NaN gaps so one trace draws many separate segments"""
+    return np.column_stack([starts, ends, np.full(len(starts), np.nan)]).ravel()
+
+def add_consolidated_team_plays(fig,team_plays,team_name,color,context=None):
+    """
+    add_team_traces drawing in a handful of traces: one None-separated line trace per
+    (category, dash style) and one marker trace per category, in the same legend groups.
+    """
+    segments = team_drive_segments(team_plays)
+    for play_type, (line_dash, marker_symbol, marker_line_color, group) in TEAM_PLAY_STYLES.items():
+        plays = segments[segments['play_category'] == play_type]
+        if len(plays) == 0:
+            continue
+        legend_group = f"{team_name}_{group}"
+        lines = plays[plays['has_segment']]
+        if len(lines) > 0:
+            # Penalty lines are ALWAYS bright red, regardless of team
+            line_color = 'rgb(255, 50, 50)' if play_type == 'penalty' else color
+            fig.add_scatter(
+                x=separated(lines['segment_x0'], lines['segment_x1']),
+                y=separated(lines['segment_y0'], lines['segment_y1']),
+                mode='lines',
+                line=dict(color=line_color, width=2, dash=line_dash),
+                showlegend=False,
+                legendgroup=legend_group,
+                hoverinfo='skip'
+            )
+        # Punts have their own markers
+        if play_type != 'punt':
+            fig.add_scatter(
+                x=plays['segment_x0'],
+                y=plays['segment_y0'],
+                mode='markers',
+                name=f'{team_name} - {play_type.capitalize()}',
+                marker=dict(
+                    size=8 if play_type == 'penalty' else 7,
+                    color='yellow' if play_type == 'penalty' else color,
+                    symbol=marker_symbol,
+                    line=dict(width=1.5, color=marker_line_color or color)
+                ),
+                **play_hover(plays,context),
+                showlegend=False,
+                legendgroup=legend_group
+            )
+    return fig
+
 # Function to add traces for a team with proper run/pass/penalty line differentiation
-def add_team_traces(fig,game_plays, team_name, color,home=True):
-    """Add traces for a team, connecting ALL plays within drives including penalties"""
-    valid_plays = game_plays[game_plays['field_position'].notna() & 
-                          game_plays['play_category'].isin(['run', 'pass', 'punt', 'penalty'])].copy()
-    team_plays =  valid_plays[(valid_plays['posteam'] == team_name)&(valid_plays['down']>0)]
+def add_team_traces(fig,game_plays, team_name, color,home=True,consolidate=False,context=None):
+    """
+    Add traces for a team, connecting ALL plays within drives including penalties.
+    consolidate=True draws the same lines and markers with a few traces per team
+    (see add_consolidated_team_plays) instead of two traces per play.
+    """
+    context = build_render_context(game_plays) if context is None else context
+    team_plays = context_rows(context,'team_plays',team_name)
     if len(team_plays) == 0:
         return
     
-    # Get unique drives for this team
-    drives = team_plays.groupby('drive')
-    
-    for drive_num, drive_data in drives:
-        # Sort by play order within drive
-        drive_data = drive_data.sort_values('play_id').reset_index(drop=True)
-        
-        # Connect consecutive plays (including penalties) with lines
-        
-        for i in range(len(drive_data)):
-            #print(drive_data)
-            current_play = drive_data.iloc[i]
-            play_type = current_play['play_category']
-            
-            # Determine line style and legend group based on play type
-            if play_type == 'run':
-                line_dash = 'solid'
-                marker_symbol = 'circle'
-                marker_line_color = 'white'
-                legend_group = f"{team_name}_run"
-            elif play_type == 'pass':
-                line_dash = 'dot'
-                marker_symbol = 'circle-open'
-                marker_line_color = color
-                legend_group = f"{team_name}_pass"
-            elif play_type == 'penalty':
-                line_dash = 'dot'  # Red dots for penalties
-                marker_symbol = 'triangle-up'
-                marker_line_color = color
-                legend_group = f"{team_name}_penalty"
-            else:  # punt or other
-                line_dash = 'dashdot'
-                marker_symbol = 'circle-open'
-                marker_line_color = 'gray'
-                legend_group = f"{team_name}_other"
+    if consolidate:
+        # Same lines and markers, a few traces per team
+        fig = add_consolidated_team_plays(fig,team_plays,team_name,color,context)
+    else:
+        # Two traces per play, read from the precomputed segment endpoints in drive / play order
+        segments = team_drive_segments(team_plays)
+        hover = {key: value if isinstance(value, str) else np.asarray(value)
+                 for key, value in play_hover(segments,context).items()}
+        columns = zip(segments['play_category'].astype(object), segments['segment_x0'], segments['segment_x1'],
+                      segments['segment_y0'], segments['segment_y1'], segments['has_segment'])
+        for i, (play_type, x0, x1, y0, y1, has_segment) in enumerate(columns):
+            line_dash, marker_symbol, marker_line_color, group = TEAM_PLAY_STYLES.get(play_type, TEAM_PLAY_STYLES['punt'])
+            marker_line_color = marker_line_color or color
+            legend_group = f"{team_name}_{group}"
             
-            # Connect to previous play in drive (ANY play type)
-            if i >= 0 and len(drive_data)>1:
-                prev_play = drive_data.iloc[i-1]
-                
-                try:
-                    next_play = drive_data.iloc[i+1]
-                    next_time = current_play['next_time_elapsed_min'] 
-
-                    #next_time = next_play['time_elapsed_min']     
-                except:
-                    next_time = current_play['next_time_elapsed_min'] 
-
+            # Connect to the next play in the drive (ANY play type)
+            if has_segment:
                 # Penalty lines are ALWAYS bright red, regardless of team
                 line_color = 'rgb(255, 50, 50)' if play_type == 'penalty' else color
-
-                if current_play['home_team'] == current_play['posteam']:
-                    field_pos_shift = current_play['yards_gained_display']
-                else:
-                    field_pos_shift = -1*current_play['yards_gained_display']
-
-                if play_type =='penalty':
-                    field_pos_shift = next_play['field_position']-current_play['field_position']
-                
-                # Add a line segment from previous play to current play
-                fig.add_trace(
-                    go.Scatter(
-                        x=[current_play['field_position'], current_play['field_position']+field_pos_shift],
-                        y=[current_play['time_elapsed_min'], next_play['time_elapsed_min']],
-                        mode='lines',
-                        line=dict(color=line_color, width=2, dash=line_dash),
-                        showlegend=False,
-                        legendgroup=legend_group,  # LINK TO LEGEND GROUP
-                        hoverinfo='skip'
-                    )
+                fig.add_scatter(
+                    x=[x0, x1],
+                    y=[y0, y1],
+                    mode='lines',
+                    line=dict(color=line_color, width=2, dash=line_dash),
+                    showlegend=False,
+                    legendgroup=legend_group,  # LINK TO LEGEND GROUP
+                    hoverinfo='skip'
                 )
             
             # Add marker for current play (skip punts since they have their own markers)
@@ -193,23 +332,20 @@ def add_team_traces(fig,game_plays, team_name, color,home=True):
                 marker_size = 8 if play_type == 'penalty' else 7
                 marker_color = 'yellow' if play_type == 'penalty' else color
                 
-                fig.add_trace(
-                    go.Scatter(
-                        x=[current_play['field_position']],
-                        y=[current_play['time_elapsed_min']],
-                        mode='markers',
-                        name=f'{team_name} - {play_type.capitalize()}',
-                        marker=dict(
-                            size=marker_size,
-                            color=marker_color,
-                            symbol=marker_symbol,
-                            line=dict(width=1.5, color=marker_line_color)
-                        ),
-                        hovertext=[current_play['hover_text']],
-                        hovertemplate='%{hovertext}<extra></extra>',
-                        showlegend=False,
-                        legendgroup=legend_group
-                    )
+                fig.add_scatter(
+                    x=[x0],
+                    y=[y0],
+                    mode='markers',
+                    name=f'{team_name} - {play_type.capitalize()}',
+                    marker=dict(
+                        size=marker_size,
+                        color=marker_color,
+                        symbol=marker_symbol,
+                        line=dict(width=1.5, color=marker_line_color)
+                    ),
+                    **{key: value if isinstance(value, str) else value[i:i+1] for key, value in hover.items()},
+                    showlegend=False,
+                    legendgroup=legend_group
                 )
 
     
@@ -219,46 +355,40 @@ def add_team_traces(fig,game_plays, team_name, color,home=True):
     rank_offset = 0 if home else 100  # Home team entries first
         
         # Run legend entry
-    fig.add_trace(
-            go.Scatter(
-                x=[None], y=[None],
-                mode='lines+markers',
-                name=f'{team} - Run',
-                line=dict(color=color, width=2, dash='solid'),
-                marker=dict(size=7, color=color, symbol='circle', line=dict(width=1.5, color='white')),
-                showlegend=True,
-                legendgroup=f"{team}_run",
-                legendrank=1 + rank_offset
-            )
-        )
+    fig.add_scatter(
+            x=[None], y=[None],
+            mode='lines+markers',
+            name=f'{team} - Run',
+            line=dict(color=color, width=2, dash='solid'),
+            marker=dict(size=7, color=color, symbol='circle', line=dict(width=1.5, color='white')),
+            showlegend=True,
+            legendgroup=f"{team}_run",
+            legendrank=1 + rank_offset
+    )
         
         # Pass legend entry
-    fig.add_trace(
-            go.Scatter(
-                x=[None], y=[None],
-                mode='lines+markers',
-                name=f'{team} - Pass',
-                line=dict(color=color, width=2, dash='dot'),
-                marker=dict(size=7, color=color, symbol='circle-open', line=dict(width=1.5, color=color)),
-                showlegend=True,
-                legendgroup=f"{team}_pass",
-                legendrank=2 + rank_offset
-            )
-        )
+    fig.add_scatter(
+            x=[None], y=[None],
+            mode='lines+markers',
+            name=f'{team} - Pass',
+            line=dict(color=color, width=2, dash='dot'),
+            marker=dict(size=7, color=color, symbol='circle-open', line=dict(width=1.5, color=color)),
+            showlegend=True,
+            legendgroup=f"{team}_pass",
+            legendrank=2 + rank_offset
+    )
         
         # Penalty legend entry - RED DOTTED LINE for visibility
-    fig.add_trace(
-            go.Scatter(
-                x=[None], y=[None],
-                mode='lines+markers',
-                name=f'{team} - Penalty',
-                line=dict(color='rgb(255, 50, 50)', width=2, dash='dot'),  # BRIGHT RED DOTS
-                marker=dict(size=8, color='yellow', symbol='triangle-up', line=dict(width=1.5, color=color)),
-                showlegend=True,
-                legendgroup=f"{team}_penalty",
-                legendrank=3 + rank_offset
-            )
-        )
+    fig.add_scatter(
+            x=[None], y=[None],
+            mode='lines+markers',
+            name=f'{team} - Penalty',
+            line=dict(color='rgb(255, 50, 50)', width=2, dash='dot'),  # BRIGHT RED DOTS
+            marker=dict(size=8, color='yellow', symbol='triangle-up', line=dict(width=1.5, color=color)),
+            showlegend=True,
+            legendgroup=f"{team}_penalty",
+            legendrank=3 + rank_offset
+    )
         
     return fig
 
@@ -334,60 +464,50 @@ def update_axes(fig,game_plays):
 
 
 
-def add_team_events(fig,game_plays,team_name,color,home=True):
-    valid_plays = game_plays[game_plays['field_position'].notna() & 
-                          game_plays['play_category'].isin(['run', 'pass', 'punt', 'penalty'])].copy()
-    team_plays =  valid_plays[(valid_plays['posteam'] == team_name)&(valid_plays['down']>0)]
-    if len(team_plays) == 0:
+def add_team_events(fig,game_plays,team_name,color,home=True,context=None):
+    context = build_render_context(game_plays) if context is None else context
+    if len(context_rows(context,'team_plays',team_name)) == 0:
         return
 
-    drive_starts = valid_plays[valid_plays['is_drive_start'] == True].copy()
-    team_drive_starts = drive_starts[drive_starts['posteam'] == team_name].copy()
+    team_drive_starts = context_rows(context,'drive_starts',team_name)
     
     if len(team_drive_starts) > 0:
-        fig.add_trace(
-            go.Scatter(
-                x=team_drive_starts['field_position'],
-                y=team_drive_starts['time_elapsed_min'],
-                mode='markers',
-                name=f'{team_name} - Drive Start',
-                marker=dict(
-                    size=11,
-                    color=color,
-                    symbol='hexagon',
-                    line=dict(width=2, color='white')
-                ),
-                hovertext=team_drive_starts['hover_text'],
-                hovertemplate='%{hovertext}<extra></extra>',
-                showlegend=True,
-                legendgroup=f"{team_name}_highlights",
-                legendrank=200 + (0 if home else 50)  # Highlights after main plays
-            )
+        fig.add_scatter(
+            x=team_drive_starts['field_position'],
+            y=team_drive_starts['time_elapsed_min'],
+            mode='markers',
+            name=f'{team_name} - Drive Start',
+            marker=dict(
+                size=11,
+                color=color,
+                symbol='hexagon',
+                line=dict(width=2, color='white')
+            ),
+            **play_hover(team_drive_starts,context),
+            showlegend=True,
+            legendgroup=f"{team_name}_highlights",
+            legendrank=200 + (0 if home else 50)  # Highlights after main plays
         )
 
 
-    first_downs = valid_plays[valid_plays['is_first_down'] == True].copy()
-    team_first_downs = first_downs[first_downs['posteam'] == team_name].copy()
+    team_first_downs = context_rows(context,'first_downs',team_name)
         
     if len(team_first_downs) > 0:
-        fig.add_trace(
-            go.Scatter(
-                x=team_first_downs['field_position'],
-                y=team_first_downs['time_elapsed_min'],
-                mode='markers',
-                name=f'{team_name} - 1st Down',
-                marker=dict(
-                    size=11,
-                    color=color,
-                    symbol='hexagon-open',  # Hollow hexagon like drive starts
-                    line=dict(width=2, color=color)
-                ),
-                hovertext=team_first_downs['hover_text'],
-                hovertemplate='%{hovertext}<extra></extra>',
-                showlegend=True,
-                legendgroup=f"{team_name}_highlights",
-                legendrank=201 + (0 if home else 50)  # Highlights after main plays
-            )
+        fig.add_scatter(
+            x=team_first_downs['field_position'],
+            y=team_first_downs['time_elapsed_min'],
+            mode='markers',
+            name=f'{team_name} - 1st Down',
+            marker=dict(
+                size=11,
+                color=color,
+                symbol='hexagon-open',  # Hollow hexagon like drive starts
+                line=dict(width=2, color=color)
+            ),
+            **play_hover(team_first_downs,context),
+            showlegend=True,
+            legendgroup=f"{team_name}_highlights",
+            legendrank=201 + (0 if home else 50)  # Highlights after main plays
         )
 
     # Add markers for each special outcome, colored by team
@@ -397,355 +517,263 @@ def add_team_events(fig,game_plays,team_name,color,home=True):
     ]
     
     for outcome in special_outcomes_to_plot:
-        outcome_plays = game_plays[game_plays['special_outcome'] == outcome].copy()
-        
-        if len(outcome_plays) > 0:
-            # Separate by team to use team colors
-            
-                # For touchdowns, use td_team if available (handles defensive TDs)
-            if outcome == 'touchdown' and 'td_team' in outcome_plays.columns:
-                team_outcome = outcome_plays[outcome_plays['td_team'] == team_name].copy()
+        # Separate by team to use team colors
+        # (touchdowns are grouped by td_team when available, to handle defensive TDs)
+        team_outcome = context_rows(context,'outcomes',(team_name, outcome))
+        
+        if len(team_outcome) > 0:
+            # Define marker style based on outcome type
+            if outcome == 'touchdown':
+                marker_style = dict(symbol='star', size=15, color=color, 
+                                      line=dict(color='black', width=2))
+            elif outcome == 'field_goal_made':
+                    marker_style = dict(symbol='diamond', size=12, color=color, 
+                                      line=dict(color='black', width=1))
+            elif outcome == 'field_goal_missed':
+                    marker_style = dict(symbol='x', size=12, color=color, 
+                                      line=dict(width=2))
+            elif outcome == 'interception':
+                    marker_style = dict(symbol='triangle-down', size=12, color=color, 
+                                      line=dict(color='black', width=1))
+            elif outcome == 'fumble_lost':
+                    marker_style = dict(symbol='triangle-down', size=12, color=color, 
+                                      line=dict(color='black', width=1))
+            elif outcome == 'punt':
+                    marker_style = dict(symbol='circle-open', size=10, color=color, 
+                                      line=dict(width=2))
+            elif outcome == 'turnover_on_downs':
+                    marker_style = dict(symbol='square', size=10, color=color, 
+                                      line=dict(color='black', width=1))
             else:
-                team_outcome = outcome_plays[outcome_plays['posteam'] == team_name].copy()
-                
-            if len(team_outcome) > 0:
-                # Define marker style based on outcome type
-                if outcome == 'touchdown':
-                    marker_style = dict(symbol='star', size=15, color=color, 
-                                          line=dict(color='black', width=2))
-                elif outcome == 'field_goal_made':
-                        marker_style = dict(symbol='diamond', size=12, color=color, 
-                                          line=dict(color='black', width=1))
-                elif outcome == 'field_goal_missed':
-                        marker_style = dict(symbol='x', size=12, color=color, 
-                                          line=dict(width=2))
-                elif outcome == 'interception':
-                        marker_style = dict(symbol='triangle-down', size=12, color=color, 
-                                          line=dict(color='black', width=1))
-                elif outcome == 'fumble_lost':
-                        marker_style = dict(symbol='triangle-down', size=12, color=color, 
-                                          line=dict(color='black', width=1))
-                elif outcome == 'punt':
-                        marker_style = dict(symbol='circle-open', size=10, color=color, 
-                                          line=dict(width=2))
-                elif outcome == 'turnover_on_downs':
-                        marker_style = dict(symbol='square', size=10, color=color, 
-                                          line=dict(color='black', width=1))
-                else:
-                    continue
-                    
-                # Determine legend name and rank
-                legend_name = f"{team_name} - {outcome.replace('_', ' ').title()}"
-                    
-                # Set legend rank based on outcome type
-                if outcome in ['touchdown', 'field_goal_made']:
-                    legend_rank = 300 + (0 if home else 50)  # Scoring first
-                elif outcome in ['interception', 'fumble_lost', 'turnover_on_downs']:
-                    legend_rank = 350 + (0 if home else 50)  # Turnovers second
-                else:
-                    legend_rank = 400 + (0 if home else 50)  # Other events last
-                    
-                fig.add_trace(
-                    go.Scatter(
-                            x=team_outcome['field_position'],
-                            y=team_outcome['time_elapsed_min'],
-                            mode='markers',
-                            name=legend_name,
-                            marker=marker_style,
-                            hovertext=team_outcome['hover_text'],
-                            hovertemplate='%{hovertext}<extra></extra>',
-                            showlegend=True,  # Show in legend
-                            legendgroup=f"{team_name}_events",
-                            legendrank=legend_rank
-                    )
-                )
-    return fig
-
-def add_score_details(fig,game_plays,team_name,color,home=True):
-# Identify extra point and 2-point conversion attempts separately
-    xp_1pt = game_plays[game_plays['extra_point_result'].notna()].copy()
-    xp_2pt = game_plays[game_plays['two_point_conv_result'].notna()].copy()
-    
-    # Process 1-point extra point attempts
-    if len(xp_1pt) > 0:
-        
-        team_xp = xp_1pt[xp_1pt['posteam'] == team_name].copy()
-            
-        if len(team_xp) > 0:
-            # Determine x position
-            xp_x_position = -50 if not home else 50
-                
-            # Separate successful and failed attempts
-            successful_xp = team_xp[team_xp['extra_point_result'] == 'good'].copy()
-            failed_xp = team_xp[team_xp['extra_point_result'].isin(['failed', 'blocked', 'missed'])].copy()
+                continue
                 
-            # Plot successful 1pt conversions
-            if len(successful_xp) > 0:
-                fig.add_trace(
-                    go.Scatter(
-                        x=[xp_x_position] * len(successful_xp),
-                        y=successful_xp['time_elapsed_min'],
-                        mode='markers',
-                        name=f'{team_name} - XP Made',
-                        marker=dict(
-                            symbol='diamond',
-                            size=9,
-                            color=color,
-                            line=dict(color='gold', width=2)
-                        ),
-                        hovertext=successful_xp['hover_text'],
-                        hovertemplate='%{hovertext}<extra></extra>',
-                        showlegend=True,
-                        legendgroup=f"{team_name}_events"
-                    )
-                )
+            # Determine legend name and rank
+            legend_name = f"{team_name} - {outcome.replace('_', ' ').title()}"
                 
-            # Plot failed 1pt conversions
-            if len(failed_xp) > 0:
-                fig.add_trace(
-                    go.Scatter(
-                        x=[xp_x_position] * len(failed_xp),
-                        y=failed_xp['time_elapsed_min'],
-                        mode='markers',
-                        name=f'{team_name} - XP Failed',
-                        marker=dict(
-                            symbol='diamond-open',
-                            size=9,
-                            color=color,
-                            line=dict(color='red', width=2)
-                        ),
-                        hovertext=failed_xp['hover_text'],
-                        hovertemplate='%{hovertext}<extra></extra>',
-                        showlegend=True,
-                        legendgroup=f"{team_name}_events"
-                    )
-                )
-    
-    # Process 2-point conversion attempts
-    if len(xp_2pt) > 0:
-        team_2pt = xp_2pt[xp_2pt['posteam'] == team_name].copy()
-            
-        if len(team_2pt) > 0:
-            # Determine x position
-            xp_x_position = -50 if not home else 50
+            # Set legend rank based on outcome type
+            if outcome in ['touchdown', 'field_goal_made']:
+                legend_rank = 300 + (0 if home else 50)  # Scoring first
+            elif outcome in ['interception', 'fumble_lost', 'turnover_on_downs']:
+                legend_rank = 350 + (0 if home else 50)  # Turnovers second
+            else:
+                legend_rank = 400 + (0 if home else 50)  # Other events last
                 
-            # Separate successful and failed attempts
-            successful_2pt = team_2pt[team_2pt['two_point_conv_result'] == 'success'].copy()
-            failed_2pt = team_2pt[team_2pt['two_point_conv_result'] == 'failure'].copy()
-            
-            # Plot successful 2pt conversions
-            if len(successful_2pt) > 0:
-                fig.add_trace(
-                    go.Scatter(
-                        x=[xp_x_position] * len(successful_2pt),
-                        y=successful_2pt['time_elapsed_min'],
-                        mode='markers',
-                        name=f'{team_name} - 2PT Made',
-                        marker=dict(
-                            symbol='square',
-                            size=10,
-                            color=color,
-                            line=dict(color='gold', width=2)
-                        ),
-                        hovertext=successful_2pt['hover_text'],
-                        hovertemplate='%{hovertext}<extra></extra>',
-                        showlegend=True,
-                        legendgroup=f"{team_name}_events"
-                    )
-                )
-            
-            # Plot failed 2pt conversions
-            if len(failed_2pt) > 0:
-                fig.add_trace(
-                    go.Scatter(
-                        x=[xp_x_position] * len(failed_2pt),
-                        y=failed_2pt['time_elapsed_min'],
-                        mode='markers',
-                        name=f'{team_name} - 2PT Failed',
-                        marker=dict(
-                            symbol='square-open',
-                            size=10,
-                            color=color,
-                            line=dict(color='red', width=2)
-                        ),
-                        hovertext=failed_2pt['hover_text'],
-                        hovertemplate='%{hovertext}<extra></extra>',
-                        showlegend=True,
-                        legendgroup=f"{team_name}_events"
-                    )
-                )
+            fig.add_scatter(
+                    x=team_outcome['field_position'],
+                    y=team_outcome['time_elapsed_min'],
+                    mode='markers',
+                    name=legend_name,
+                    marker=marker_style,
+                    **play_hover(team_outcome,context),
+                    showlegend=True,  # Show in legend
+                    legendgroup=f"{team_name}_events",
+                    legendrank=legend_rank
+            )
     return fig
 
-def add_kicks(fig,game_plays):
-    kickoff_plays = game_plays[game_plays['play_category'] == 'kickoff'].copy()
-
-    if len(kickoff_plays) > 0:
-    # Add each kickoff as a line segment trace with hover text
-        for idx, row in kickoff_plays.iterrows():
-            # Create hover text for this specific kickoff
-            
-            hover_text = []
-            hover_text = (
-                f"<b>KICKOFF - Q{row['qtr']} {row['time']}</b><br>"
-                f"{row['posteam']} kicks off<br>"
-                f"{row['desc']}"
-            )
-            
-            fig.add_trace(
-                go.Scatter(
-                    x=[-55, 55],  # Horizontal line across entire field
-                    y=[row['time_elapsed_min'], row['time_elapsed_min']],
-                    mode='lines',
-                    line=dict(color='purple', width=1.5, dash='dash'),
-                    name='Kickoffs',
-                    text=[hover_text, hover_text],  # One for each endpoint
-                    hovertemplate='%{text}<extra></extra>',
-                    showlegend=False,  # We'll add one legend entry below
-                    legendgroup='kickoffs',
-                    opacity=0.4
-                )
-            )
-        
-        # Add single legend entry for all kickoffs
-        fig.add_trace(
-            go.Scatter(
-                x=[None], y=[None],
-                mode='lines',
-                name='Kickoffs',
-                line=dict(color='purple', width=1.5, dash='dash'),
+# Marker and legend name for each extra point / 2PT result, in drawing order
+EXTRA_POINT_MARKERS = {
+    'xp_made': ('XP Made', dict(symbol='diamond', size=9, line_color='gold')),
+    'xp_failed': ('XP Failed', dict(symbol='diamond-open', size=9, line_color='red')),
+    '2pt_made': ('2PT Made', dict(symbol='square', size=10, line_color='gold')),
+    '2pt_failed': ('2PT Failed', dict(symbol='square-open', size=10, line_color='red')),
+}
+
+def add_score_details(fig,game_plays,team_name,color,home=True,context=None):
+    # Extra point and 2-point conversion attempts, separated by result in the render context
+    context = build_render_context(game_plays) if context is None else context
+    
+    # Determine x position
+    xp_x_position = -50 if not home else 50
+    
+    for kind, (label, style) in EXTRA_POINT_MARKERS.items():
+        attempts = context_rows(context,'extra_points',(team_name, kind))
+        if len(attempts) > 0:
+            fig.add_scatter(
+                x=[xp_x_position] * len(attempts),
+                y=attempts['time_elapsed_min'],
+                mode='markers',
+                name=f'{team_name} - {label}',
+                marker=dict(
+                    symbol=style['symbol'],
+                    size=style['size'],
+                    color=color,
+                    line=dict(color=style['line_color'], width=2)
+                ),
+                **play_hover(attempts,context),
                 showlegend=True,
-                legendgroup='kickoffs',
-                legendrank=550,  # Near bottom with other events
-                opacity=0.4
+                legendgroup=f"{team_name}_events"
             )
+    return fig
+
+def as_text(values):
+    """str() of each value, as an f-string formats it (missing values read 'nan' rather than blanking the label)"""
+    return values.astype(object).map(str)
+
+def kickoff_hover_text(kickoff_plays):
+    """Hover text for every kickoff, built column-wise"""
+    return ("<b>KICKOFF - Q" + as_text(kickoff_plays['qtr']) + " " + as_text(kickoff_plays['time']) + "</b><br>"
+            + as_text(kickoff_plays['posteam']) + " kicks off<br>"
+            + as_text(kickoff_plays['desc']))
+
+def turnover_hover_text(turnover_plays):
+    """Hover text for every turnover, built column-wise"""
+    outcome = as_text(turnover_plays['special_outcome']).str.replace('_', ' ').str.title()
+    return ("<b>TURNOVER - Q" + as_text(turnover_plays['qtr']) + " " + as_text(turnover_plays['time']) + "</b><br>"
+            + as_text(turnover_plays['posteam']) + " → " + as_text(turnover_plays['defteam']) + "<br>"
+            + outcome + "<br>"
+            + as_text(turnover_plays['desc']).str[:100])
+
+def add_field_lines(fig,times,hover_text,name,line,legendgroup,opacity,legendrank,consolidate=False):
+    """
+    Horizontal lines across the whole field at each time, with hover text, plus one legend entry.
+    consolidate=True draws every line in a single NaN-separated trace that also carries the legend entry;
+    otherwise each line is its own trace and a dummy trace holds the legend entry.
+    """
+    times = np.asarray(times, dtype=float)
+    hover_text = np.asarray(hover_text, dtype=object)
+    if consolidate:
+        fig.add_scatter(
+            x=separated(np.full(len(times), -55), np.full(len(times), 55)),  # Horizontal line across entire field
+            y=separated(times, times),
+            mode='lines',
+            line=line,
+            name=name,
+            text=np.column_stack([hover_text, hover_text, np.full(len(times), None)]).ravel(),
+            hovertemplate='%{text}<extra></extra>',
+            showlegend=True,
+            legendgroup=legendgroup,
+            legendrank=legendrank,
+            opacity=opacity
         )
+        return fig
+
+    for time, text in zip(times, hover_text):
+        fig.add_scatter(
+            x=[-55, 55],  # Horizontal line across entire field
+            y=[time, time],
+            mode='lines',
+            line=line,
+            name=name,
+            text=[text, text],  # One for each endpoint
+            hovertemplate='%{text}<extra></extra>',  # Use %{text} to suppress x,y
+            showlegend=False,  # We'll add one legend entry below
+            legendgroup=legendgroup,
+            opacity=opacity
+        )
+
+    # Add single legend entry for all lines
+    fig.add_scatter(
+        x=[None], y=[None],
+        mode='lines',
+        name=name,
+        line=line,
+        showlegend=True,
+        legendgroup=legendgroup,
+        legendrank=legendrank,
+        opacity=opacity
+    )
+    return fig
+
+def add_kicks(fig,game_plays,consolidate=False,context=None):
+    context = build_render_context(game_plays) if context is None else context
+    kickoff_plays = context['kickoffs']
+
+    if len(kickoff_plays) > 0:
+        # Add each kickoff as a line across the field with hover text
+        fig = add_field_lines(fig,kickoff_plays['time_elapsed_min'],kickoff_hover_text(kickoff_plays),
+                              name='Kickoffs',
+                              line=dict(color='purple', width=1.5, dash='dash'),
+                              legendgroup='kickoffs',
+                              opacity=0.4,
+                              legendrank=550,  # Near bottom with other events
+                              consolidate=consolidate)
     return fig
 
-def add_turnovers(fig,game_plays):
-    turnover_plays = game_plays[game_plays['special_outcome'].isin([
-        'interception', 'fumble_lost', 'turnover_on_downs'
-    ])].copy()
+def add_turnovers(fig,game_plays,consolidate=False,context=None):
+    context = build_render_context(game_plays) if context is None else context
+    turnover_plays = context['turnovers']
     
     if len(turnover_plays) > 0:
-        # Add each turnover as a line segment trace with hover text
-        for idx, row in turnover_plays.iterrows():
-            # Create hover text for this specific turnover
-            hover_text = (
-                f"<b>TURNOVER - Q{row['qtr']} {row['time']}</b><br>"
-                f"{row['posteam']} → {row['defteam']}<br>"
-                f"{row['special_outcome'].replace('_', ' ').title()}<br>"
-                f"{row['desc'][:100]}"
-            )
-            
-            fig.add_trace(
-                go.Scatter(
-                    x=[-55, 55],  # Horizontal line across entire field
-                    y=[row['time_elapsed_min'], row['time_elapsed_min']],
-                    mode='lines',
-                    line=dict(color='red', width=1.5, dash='dot'),
-                    name='Turnovers',
-                    text=[hover_text, hover_text],  # One for each endpoint
-                    hovertemplate='%{text}<extra></extra>',  # Use %{text} to suppress x,y
-                    showlegend=False,  # We'll add one legend entry below
-                    legendgroup='turnovers',
-                    opacity=0.5
-                )
-            )
-        
-        # Add single legend entry for all turnovers
-        fig.add_trace(
-            go.Scatter(
-                x=[None], y=[None],
-                mode='lines',
-                name='Turnovers',
-                line=dict(color='red', width=1.5, dash='dot'),
-                showlegend=True,
-                legendgroup='turnovers',
-                legendrank=550,  # Right after kickoffs
-                opacity=0.5
-            )
-        )
+        # Add each turnover as a line across the field with hover text
+        fig = add_field_lines(fig,turnover_plays['time_elapsed_min'],turnover_hover_text(turnover_plays),
+                              name='Turnovers',
+                              line=dict(color='red', width=1.5, dash='dot'),
+                              legendgroup='turnovers',
+                              opacity=0.5,
+                              legendrank=550,  # Right after kickoffs
+                              consolidate=consolidate)
     return fig
 
-def add_score_labels(fig,game_plays,home_color='#1f77b4',away_color='#ff7f0e'):
+def score_after_conversion(game_plays,scoring_plays):
+    """
+    (home, away) score to label each scoring play with: for touchdowns the score after the
+    XP / 2PT try when one is among the next three plays (by play_id), otherwise the play's own.
+    Resolved for all scoring plays at once with one searchsorted on play_id.
+    """
+    home_score = scoring_plays['total_home_score'].to_numpy(dtype=float)
+    away_score = scoring_plays['total_away_score'].to_numpy(dtype=float)
+    if len(scoring_plays) == 0:
+        return home_score, away_score
+
+    play_ids = game_plays['play_id'].to_numpy(dtype=float)
+    order = np.argsort(play_ids, kind='stable')
+    is_try = (game_plays['extra_point_result'].notna() | game_plays['two_point_conv_result'].notna()).to_numpy()[order]
+    try_home_score = game_plays['total_home_score'].to_numpy(dtype=float)[order]
+    try_away_score = game_plays['total_away_score'].to_numpy(dtype=float)[order]
+
+    next_play = np.searchsorted(play_ids[order], scoring_plays['play_id'].to_numpy(dtype=float), side='right')
+    pending = (scoring_plays['special_outcome'] == 'touchdown').to_numpy()
+    for offset in range(3):
+        candidate = next_play + offset
+        found = pending & (candidate < len(order)) & is_try[np.minimum(candidate, len(order) - 1)]
+        home_score = np.where(found, try_home_score[np.minimum(candidate, len(order) - 1)], home_score)
+        away_score = np.where(found, try_away_score[np.minimum(candidate, len(order) - 1)], away_score)
+        pending = pending & ~found
+    return home_score, away_score
+
+def figure_annotations(fig):
+    """Annotations already on a go.Figure or FigureSpec, as a list"""
+    if isinstance(fig.layout, dict):
+        return list(fig.layout.get('annotations', []))
+    return list(fig.layout.annotations)
+
+def add_score_labels(fig,game_plays,home_color='#1f77b4',away_color='#ff7f0e',context=None):
     # Identify all scoring plays (touchdowns and field goals)
     # For touchdowns, we want to show the score AFTER the XP/2PT attempt
-    scoring_plays_raw = game_plays[game_plays['special_outcome'].isin(['touchdown', 'field_goal_made'])].copy()
-    score_annotations = []
-    
-    # Create annotation data for each scoring play
-    for idx, row in scoring_plays_raw.iterrows():
-        # For defensive TDs, use td_team instead of posteam
-        # td_team indicates who scored, posteam indicates who had possession
-        if 'td_team' in row.index and pd.notna(row['td_team']):
-            scoring_team = row['td_team']
-        else:
-            scoring_team = row['posteam']
-        
-        # For touchdowns, try to find the subsequent XP/2PT attempt to get final score
-        if row['special_outcome'] == 'touchdown':
-            # Look for XP/2PT attempt in next few plays
-            next_plays = game_plays[game_plays['play_id'] > row['play_id']].head(3)
-            xp_play = next_plays[
-                (next_plays['extra_point_result'].notna()) | 
-                (next_plays['two_point_conv_result'].notna())
-            ]
-            
-            if len(xp_play) > 0:
-                # Use score after XP/2PT
-                score_row = xp_play.iloc[0]
-            else:
-                # No XP found, use TD score
-                score_row = row
-        else:
-            # Field goal - use immediately
-            score_row = row
-        
-        home_score = int(score_row['total_home_score'])
-        away_score = int(score_row['total_away_score'])
-        
-        home_team = game_plays['home_team'].iloc[0]
-        away_team = game_plays['away_team'].iloc[0]
-        # Determine color and position based on which team scored
-        team_colors={home_team:home_color,away_team:away_color}
-        
-        text_color = team_colors[scoring_team]
-        
-        # Position on the side of the team that scored
-        if scoring_team == home_team:
-            text_x = 52  # Right side for home team
-            text_anchor = 'left'
-        else:  # away team
-            text_x = -52  # Left side for away team
-            text_anchor = 'right'
-        
-        # Format score text (away-home)
-        score_text = f"{away_score}-{home_score}"
-        
-        text_y = row['time_elapsed_min']  # Use original play time for positioning
-        
-        score_annotations.append(
-            dict(
-                x=text_x,
-                y=text_y,
-                text=score_text,
-                showarrow=False,
-                font=dict(
-                    size=13,
-                    color=text_color,
-                    family="Arial Black, sans-serif"
-                ),
-                xanchor=text_anchor,
-                # No background box - just text
-            )
+    context = build_render_context(game_plays) if context is None else context
+    scoring_plays = context['scoring_plays']
+    home_team = context['home_team']
+    
+    # For defensive TDs, use td_team instead of posteam
+    # td_team indicates who scored, posteam indicates who had possession
+    scoring_team = scoring_plays['posteam'].astype(object)
+    if 'td_team' in scoring_plays.columns:
+        scoring_team = scoring_plays['td_team'].astype(object).where(scoring_plays['td_team'].notna(), scoring_team)
+    home_scored = (scoring_team == home_team).to_numpy()
+    
+    home_score, away_score = score_after_conversion(game_plays,scoring_plays)
+    
+    # Position on the side of the team that scored (right for home, left for away), score text is away-home
+    score_annotations = [
+        dict(
+            x=52 if home else -52,
+            y=text_y,  # Use original play time for positioning
+            text=f"{int(away)}-{int(home_points)}",
+            showarrow=False,
+            font=dict(
+                size=13,
+                color=home_color if home else away_color,
+                family="Arial Black, sans-serif"
+            ),
+            xanchor='left' if home else 'right',
+            # No background box - just text
         )
-    try:
-        current_annotations = list(fig.layout.annotations)
-        current_annotations.append(score_annotations)
-        fig.update_layout(annotations=current_annotations)
-    except:
-        fig.update_layout(annotations=score_annotations)
-
+        for home, text_y, away, home_points in zip(home_scored, scoring_plays['time_elapsed_min'].tolist(), away_score, home_score)
+    ]
+    
+    # Added to any annotations already on the figure, in one layout update
+    fig.update_layout(annotations=figure_annotations(fig) + score_annotations)
      
     return fig
 
@@ -788,93 +816,29 @@ def format_main_layout(fig,game_plays,home_color='#1f77b4',away_color='#ff7f0e')
 
     
 # Create combined game stats table
-def add_game_table(fig,game_plays):
-    home_team = game_plays['home_team'].iloc[0]
-    away_team = game_plays['away_team'].iloc[0]
-    
-    # Table 1: Scoring Events & Lead Changes
-    scoring_events = game_plays[game_plays['special_outcome'].isin(['touchdown', 'field_goal_made'])].copy()
-    
-    home_tds = len(scoring_events[(scoring_events['posteam'] == home_team) & (scoring_events['special_outcome'] == 'touchdown')])
-    away_tds = len(scoring_events[(scoring_events['posteam'] == away_team) & (scoring_events['special_outcome'] == 'touchdown')])
-    home_fgs = len(scoring_events[(scoring_events['posteam'] == home_team) & (scoring_events['special_outcome'] == 'field_goal_made')])
-    away_fgs = len(scoring_events[(scoring_events['posteam'] == away_team) & (scoring_events['special_outcome'] == 'field_goal_made')])
-    
-    # Calculate lead changes
-    lead_changes = 0
-    prev_leader = None
-    for idx, row in game_plays.iterrows():
-        margin = row['score_margin']
-        if margin > 0:
-            current_leader = home_team
-        elif margin < 0:
-            current_leader = away_team
-        else:
-            current_leader = 'Tie'
-        
-        if prev_leader is not None and current_leader != prev_leader and current_leader != 'Tie' and prev_leader != 'Tie':
-            lead_changes += 1
-        prev_leader = current_leader
-    
-    # Table 2: Drive & Yards Summary
-    drive_summary = game_plays[game_plays['play_type'].isin(['pass', 'run'])].groupby('posteam').agg({
-        'drive': 'nunique',
-        'yards_gained': 'sum',
-        'play_id': 'count'
-    }).reset_index()
-    
-    drive_summary.columns = ['team', 'drives', 'total_yards', 'plays']
-    
-    # Calculate passing vs rushing yards
-    pass_yards = game_plays[game_plays['play_type'] == 'pass'].groupby('posteam')['yards_gained'].sum()
-    rush_yards = game_plays[game_plays['play_type'] == 'run'].groupby('posteam')['yards_gained'].sum()
-    
-    # Penalty yards
-    penalty_yards = game_plays[game_plays['penalty'] == 1].groupby('posteam')['penalty_yards'].sum()
-    
-    # Get final values
-    home_drives = drive_summary[drive_summary['team'] == home_team]['drives'].values[0] if len(drive_summary[drive_summary['team'] == home_team]) > 0 else 0
-    away_drives = drive_summary[drive_summary['team'] == away_team]['drives'].values[0] if len(drive_summary[drive_summary['team'] == away_team]) > 0 else 0
-
-    
-    # Calculate points per drive
-    final_home_score = int(game_plays['total_home_score'].iloc[-1])
-    final_away_score = int(game_plays['total_away_score'].iloc[-1])
-    home_ppd = final_home_score / home_drives if home_drives > 0 else 0
-    away_ppd = final_away_score / away_drives if away_drives > 0 else 0
-    
-    home_pass_yds = pass_yards.get(home_team, 0)
-    away_pass_yds = pass_yards.get(away_team, 0)
-    home_rush_yds = rush_yards.get(home_team, 0)
-    away_rush_yds = rush_yards.get(away_team, 0)
-    
-    home_penalty_yds = penalty_yards.get(home_team, 0)
-    away_penalty_yds = penalty_yards.get(away_team, 0)
-    
-    home_total_plays = drive_summary[drive_summary['team'] == home_team]['plays'].values[0] if len(drive_summary[drive_summary['team'] == home_team]) > 0 else 0
-    away_total_plays = drive_summary[drive_summary['team'] == away_team]['plays'].values[0] if len(drive_summary[drive_summary['team'] == away_team]) > 0 else 0
-
-    real_plays = game_plays[game_plays['is_real_play']]
-    avg_excitement = real_plays['play_excitement'].mean()
-    avg_unpredictability = real_plays['play_unpredictability'].mean()
+def add_game_table(fig,game_plays,context=None):
+    # Every number comes from game_summary (precomputed in the render context); this only formats the table
+    summary = game_summary(game_plays).iloc[0] if context is None else context['game_summary']
+    home_team = summary['home_team']
+    away_team = summary['away_team']
     
     combined_stats_text = (
         f"<b>Scoring Summary</b><br>"
-        f"{home_team}: {home_tds} TD, {home_fgs} FG<br>"
-        f"{away_team}: {away_tds} TD, {away_fgs} FG<br>"
-        f"Lead Changes: {lead_changes}<br>"
+        f"{home_team}: {int(summary['home_tds'])} TD, {int(summary['home_fgs'])} FG<br>"
+        f"{away_team}: {int(summary['away_tds'])} TD, {int(summary['away_fgs'])} FG<br>"
+        f"Lead Changes: {int(summary['lead_changes'])}<br>"
         f"<br>"
         f"<b>Drive & Yards</b><br>"
-        f"<b>{home_team}</b>: {int(home_drives)} drives, {int(home_total_plays)} plays<br>"
-        f"  Pass: {int(home_pass_yds)} | Rush: {int(home_rush_yds)} | Pen: {int(home_penalty_yds)} yds<br>"
-        f"  PPD: {home_ppd:.2f}<br>"
-        f"<b>{away_team}</b>: {int(away_drives)} drives, {int(away_total_plays)} plays<br>"
-        f"  Pass: {int(away_pass_yds)} | Rush: {int(away_rush_yds)} | Pen: {int(away_penalty_yds)} yds<br>"
-        f"  PPD: {away_ppd:.2f}<br>"
+        f"<b>{home_team}</b>: {int(summary['home_drives'])} drives, {int(summary['home_plays'])} plays<br>"
+        f"  Pass: {int(summary['home_pass_yards'])} | Rush: {int(summary['home_rush_yards'])} | Pen: {int(summary['home_penalty_yards'])} yds<br>"
+        f"  PPD: {summary['home_ppd']:.2f}<br>"
+        f"<b>{away_team}</b>: {int(summary['away_drives'])} drives, {int(summary['away_plays'])} plays<br>"
+        f"  Pass: {int(summary['away_pass_yards'])} | Rush: {int(summary['away_rush_yards'])} | Pen: {int(summary['away_penalty_yards'])} yds<br>"
+        f"  PPD: {summary['away_ppd']:.2f}<br>"
         f"<br>"
         f"<b>Game Metrics</b><br>"
-        f"Avg Excitement: {avg_excitement:.2f} pp<br>"
-        f"Avg Unpredictability: {avg_unpredictability:.3f}"
+        f"Avg Excitement: {summary['avg_excitement']:.2f} pp<br>"
+        f"Avg Unpredictability: {summary['avg_unpredictability']:.3f}"
     )
     
     combined_stats_dict =dict(text=combined_stats_text,
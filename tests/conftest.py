@@ -0,0 +1,17 @@
+import os
+import sys
+import pytest
+
+# Import the SWEEP package from this checkout
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from SWEEP.sweep_main import make_sweep_data
+from season_fixture import fixture_season
+
+
+@pytest.fixture(scope='session')
+def ot_game():
+    """Enriched first fixture game (an OT game) with its home / away teams"""
+    season_data = fixture_season(weeks=1)
+    game_id = season_data['game_id'].iloc[0]
+    game_plays, home_team, away_team = make_sweep_data(season_data[season_data['game_id'] == game_id])[:3]
+    return game_plays, home_team, away_team
@@ -0,0 +1,146 @@
+"""Small synthetic nflverse-style play-by-play seasons for the pipeline tests"""
+import numpy as np
+import pandas as pd
+
+TEAMS = ['BUF', 'KC', 'NE', 'MIA', 'NYJ', 'BAL', 'PIT', 'CLE']
+
+
+def fixture_game(rng, game_id, week, home, away, season_type='REG', ot=False, season=2021):
+    """One game of drives (kickoff, downs, punts / field goals / turnovers / touchdowns), with OT if asked"""
+    rows = []
+    play_id = 1
+    home_score = away_score = 0
+
+    def add(**play):
+        nonlocal play_id
+        row = dict(play_id=play_id, game_id=game_id, season=season, week=week, home_team=home, away_team=away,
+                   game_date=f'{season}-09-{10 + week:02d}', season_type=season_type,
+                   total_home_score=home_score, total_away_score=away_score, penalty=0.0, penalty_yards=np.nan,
+                   touchdown=0.0, td_team=np.nan, field_goal_result=np.nan, interception=0.0, fumble_lost=0.0,
+                   punt_attempt=0.0, fourth_down_failed=0.0, first_down=0.0, extra_point_result=np.nan,
+                   two_point_conv_result=np.nan, yards_gained=0.0, down=np.nan, ydstogo=np.nan,
+                   yardline_100=np.nan, play_type=np.nan, drive=np.nan, posteam=np.nan, defteam=np.nan,
+                   wp=np.nan, vegas_wp=np.nan, yrdln=np.nan)
+        row.update(play)
+        rows.append(row)
+        play_id += int(rng.integers(20, 60))
+
+    def score(team, points):
+        nonlocal home_score, away_score
+        if team == home:
+            home_score += points
+        else:
+            away_score += points
+
+    offense = home if rng.random() < .5 else away
+    drive = 0
+    home_wp = .55
+    for qtr in range(1, 6 if ot else 5):
+        seconds = 900 if qtr <= 4 or season_type == 'POST' else 600
+        while seconds > 30:
+            drive += 1
+            defense = away if offense == home else home
+            game_seconds = lambda: 3600 - (qtr - 1) * 900 - (900 - seconds) if qtr <= 4 else np.nan
+            clock = lambda: f'{seconds // 60:02d}:{seconds % 60:02d}'
+            kick_wp = home_wp if offense == home else 1 - home_wp
+            add(qtr=qtr, quarter_seconds_remaining=float(seconds), game_seconds_remaining=game_seconds(),
+                play_type='kickoff', posteam=offense, defteam=defense, yardline_100=35.0, drive=float(drive),
+                desc=f'{defense} kicks 65 yards', time=clock(), yrdln=f'{defense} 35', wp=kick_wp, vegas_wp=kick_wp)
+            seconds -= 5
+            yardline = float(rng.integers(60, 80))
+            down, to_go = 1, 10
+            while seconds > 30:
+                home_wp = float(np.clip(home_wp + rng.normal(0, .04), .01, .99))
+                wp = home_wp if offense == home else 1 - home_wp
+                base = dict(qtr=qtr, quarter_seconds_remaining=float(seconds), game_seconds_remaining=game_seconds(),
+                            posteam=offense, defteam=defense, drive=float(drive), time=clock(),
+                            yardline_100=yardline, yrdln=f'{offense} {int(100 - yardline)}', wp=wp,
+                            vegas_wp=wp * 0.98 + 0.01)
+                if rng.random() < .04:
+                    add(**base, desc=f'Timeout #1 by {offense} at {base["time"]}.')
+                    continue
+                if down == 4:
+                    if yardline < 35:
+                        good = rng.random() < .8
+                        if good:
+                            score(offense, 3)
+                        add(**base, play_type='field_goal', down=4.0, ydstogo=float(to_go),
+                            field_goal_result='made' if good else 'missed', total_home_score=home_score,
+                            total_away_score=away_score,
+                            desc=f'{yardline + 17:.0f} yard field goal is {"GOOD" if good else "No Good"}')
+                    elif rng.random() < .15:
+                        add(**base, play_type='run', down=4.0, ydstogo=float(to_go), fourth_down_failed=1.0,
+                            desc='run up the middle for no gain. TURNOVER ON DOWNS')
+                    else:
+                        add(**base, play_type='punt', down=4.0, ydstogo=float(to_go), punt_attempt=1.0,
+                            desc='punts 45 yards')
+                    seconds -= 10
+                    break
+                play_type = 'pass' if rng.random() < .55 else 'run'
+                gain = float(rng.integers(-3, 18))
+                if rng.random() < .07:
+                    add(**base, play_type='no_play', down=float(down), ydstogo=float(to_go), penalty=1.0,
+                        penalty_yards=5.0, desc='PENALTY on X, False Start, 5 yards')
+                    yardline = min(yardline + 5, 99)
+                    to_go += 5
+                    seconds -= 10
+                    continue
+                if rng.random() < .03:
+                    turnover = 'interception' if play_type == 'pass' else 'fumble_lost'
+                    add(**base, play_type=play_type, down=float(down), ydstogo=float(to_go), **{turnover: 1.0},
+                        desc=f'{play_type} INTERCEPTED' if play_type == 'pass' else 'FUMBLES recovered')
+                    seconds -= 10
+                    break
+                if gain >= yardline:
+                    score(offense, 6)
+                    add(**base, play_type=play_type, down=float(down), ydstogo=float(to_go), touchdown=1.0,
+                        td_team=offense, yards_gained=yardline, first_down=1.0, total_home_score=home_score,
+                        total_away_score=away_score, desc=f'{play_type} for {yardline:.0f} yards, TOUCHDOWN.')
+                    seconds -= 8
+                    after = dict(base, time=base['time'], quarter_seconds_remaining=float(seconds))
+                    if rng.random() < .85:
+                        good = rng.random() < .9
+                        if good:
+                            score(offense, 1)
+                        add(**dict(after, yardline_100=15.0), play_type='extra_point',
+                            extra_point_result='good' if good else 'failed', desc='extra point',
+                            total_home_score=home_score, total_away_score=away_score)
+                    else:
+                        good = rng.random() < .5
+                        if good:
+                            score(offense, 2)
+                        add(**dict(after, yardline_100=2.0), play_type='pass',
+                            two_point_conv_result='success' if good else 'failure',
+                            desc='TWO-POINT CONVERSION ATTEMPT', total_home_score=home_score,
+                            total_away_score=away_score)
+                    break
+                first_down = gain >= to_go
+                add(**base, play_type=play_type, down=float(down), ydstogo=float(to_go), yards_gained=gain,
+                    first_down=float(first_down), desc=f'{play_type} for {gain:.0f} yards')
+                yardline -= gain
+                if first_down:
+                    down, to_go = 1, 10
+                else:
+                    down += 1
+                    to_go -= gain
+                seconds -= int(rng.integers(20, 45))
+            offense = defense
+        add(qtr=qtr, quarter_seconds_remaining=0.0, game_seconds_remaining=np.nan, desc=f'END QUARTER {qtr}',
+            time='00:00')
+    rows[-1]['desc'] = 'END GAME'
+    game_plays = pd.DataFrame(rows)
+    game_plays['home_score'] = home_score
+    game_plays['away_score'] = away_score
+    return game_plays
+
+
+def fixture_season(seed=0, weeks=2, season=2021):
+    """len(TEAMS) / 2 games per week, rows grouped by game; the first game of each week goes to OT"""
+    rng = np.random.default_rng(seed)
+    games = []
+    for week in range(1, weeks + 1):
+        teams = list(rng.permutation(TEAMS))
+        for k in range(0, len(teams), 2):
+            game_id = f'{season}_{week:02d}_{teams[k + 1]}_{teams[k]}'
+            games.append(fixture_game(rng, game_id, week, teams[k], teams[k + 1], ot=(k == 0), season=season))
+    return pd.concat(games, ignore_index=True)
@@ -0,0 +1,19 @@
+import pandas as pd
+from SWEEP.sweep_data import build_game_catalog, find_games, get_catalog_game
+from season_fixture import fixture_season
+
+
+def test_catalog_from_shuffled_rows_matches_sorted():
+    season_data = fixture_season()
+    shuffled = season_data.sample(frac=1, random_state=0)
+    catalog = build_game_catalog(season_data)
+    shuffled_catalog = build_game_catalog(shuffled)
+
+    info_columns = catalog.columns.drop(['start', 'stop'])
+    pd.testing.assert_frame_equal(shuffled_catalog.loc[catalog.index, info_columns], catalog[info_columns])
+    assert (catalog.loc[catalog['week'] == 1, 'ot_len'] == 600).all()
+    for game_id in catalog.index:
+        game_plays, game_info = get_catalog_game(season_data, game_id, catalog)
+        shuffled_plays, shuffled_info = get_catalog_game(shuffled, game_id, find_games(shuffled_catalog, week=None))
+        assert shuffled_info == game_info
+        pd.testing.assert_frame_equal(shuffled_plays.sort_index(), game_plays)
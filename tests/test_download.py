@@ -0,0 +1,126 @@
+import functools
+import gzip
+import http.server
+import os
+import threading
+import time
+import numpy as np
+import pandas as pd
+import pytest
+import requests
+from SWEEP import sweep_download
+from SWEEP.sweep_download import (SWEEP_SCHEMA, download_nfl_data_season, download_nfl_data_seasons, evict_season_cache,
+                                  load_cached_season, read_season_csv, read_season_stream, save_cached_season,
+                                  season_cache_entries, season_cache_paths)
+
+
+def season_csv(path, plays=3000):
+    """A gzipped play-by-play csv with some SWEEP_SCHEMA columns and an extra column the schema skips"""
+    rng = np.random.default_rng(0)
+    pbp = pd.DataFrame({
+        'game_id': np.repeat(['2021_01_KC_BUF', '2021_01_NE_MIA'], plays // 2),
+        'play_id': np.arange(plays, dtype=float),
+        'week': 1,
+        'home_team': np.repeat(['BUF', 'MIA'], plays // 2),
+        'away_team': np.repeat(['KC', 'NE'], plays // 2),
+        'posteam': rng.choice(['BUF', 'KC', 'MIA', 'NE'], plays),
+        'qtr': rng.integers(1, 5, plays),
+        'yards_gained': rng.integers(-5, 30, plays).astype(float),
+        'desc': rng.choice(['run for 3 yards', 'pass incomplete', 'Timeout #1 by KC.', 'END QUARTER 1'], plays),
+        'extra_column': rng.random(plays),
+    })
+    with gzip.open(path, 'wt') as f:
+        pbp.to_csv(f, index=False)
+    return path
+
+
+class QuietHandler(http.server.SimpleHTTPRequestHandler):
+    """Static file handler that keeps request logs out of the test output"""
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def season_server(tmp_path):
+    """Local HTTP stand-in for the nflverse release server, serving play_by_play_2021.csv.gz"""
+    season_csv(tmp_path / 'play_by_play_2021.csv.gz')
+    handler = functools.partial(QuietHandler, directory=str(tmp_path))
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}", tmp_path
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.mark.parametrize('schema', [None, SWEEP_SCHEMA])
+def test_read_season_stream_matches_file_parse(season_server, schema):
+    url, data_dir = season_server
+    with requests.get(f"{url}/play_by_play_2021.csv.gz", stream=True) as response:
+        streamed = read_season_stream(response, schema, chunk_size=4096, report=False)
+    parsed = read_season_csv(data_dir / 'play_by_play_2021.csv.gz', schema, report=False)
+    pd.testing.assert_frame_equal(streamed, parsed)
+    assert ('extra_column' in streamed.columns) == (schema is None)
+
+
+def test_download_season_streams_and_caches(season_server, monkeypatch, tmp_path_factory):
+    url, data_dir = season_server
+    cache_dir = str(tmp_path_factory.mktemp('cache'))
+    monkeypatch.setattr(sweep_download, 'NFL_DATA_URL', url + '/play_by_play_{season}.csv.gz')
+    pbp = download_nfl_data_season(2021, cache_dir=cache_dir)
+    assert len(pbp) == 3000
+    assert isinstance(pbp['posteam'].dtype, pd.CategoricalDtype)
+    # Second load comes from the cache
+    (data_dir / 'play_by_play_2021.csv.gz').unlink()
+    pd.testing.assert_frame_equal(download_nfl_data_season(2021, cache_dir=cache_dir), pbp)
+
+
+def test_download_seasons_keeps_seasons_parsed_before_a_corrupt_one(season_server, monkeypatch):
+    url, data_dir = season_server
+    (data_dir / 'play_by_play_2020.csv.gz').write_bytes(b'not a gzip file')
+    monkeypatch.setattr(sweep_download, 'NFL_DATA_URL', url + '/play_by_play_{season}.csv.gz')
+    data, timings = download_nfl_data_seasons([2020, 2021], max_workers=2, parse_workers=1, as_dict=True,
+                                              use_cache=False)
+    assert list(data) == [2021]
+    assert len(data[2021]) == 3000
+    assert timings[2020]['source'] == 'error'
+
+
+
+def test_download_seasons_keeps_seasons_fetched_besides_a_failed_write(season_server, monkeypatch, capsys):
+    url, data_dir = season_server
+    monkeypatch.setattr(sweep_download, 'NFL_DATA_URL', url + '/play_by_play_{season}.csv.gz')
+    fetch_season_file = sweep_download.fetch_season_file
+
+    def fetch_or_fail(session, season, *args, **kwargs):
+        if season == 2020:
+            raise OSError(28, 'No space left on device')
+        return fetch_season_file(session, season, *args, **kwargs)
+
+    monkeypatch.setattr(sweep_download, 'fetch_season_file', fetch_or_fail)
+    data, timings = download_nfl_data_seasons([2020, 2021], max_workers=2, parse_workers=1, as_dict=True,
+                                              use_cache=False)
+    assert list(data) == [2021]
+    assert timings[2020]['source'] == 'error'
+    assert '✗ 2020: could not download (OSError' in capsys.readouterr().out
+
+def test_evict_season_cache_removes_least_recently_used(tmp_path):
+    cache_dir = str(tmp_path)
+    pbp = pd.DataFrame({'play_id': np.arange(500, dtype=float), 'desc': 'run for 3 yards'})
+    now = time.time()
+    for age, season in enumerate([2021, 2020, 2019, 2018]):
+        data_path = save_cached_season(season, pbp, cache_dir=cache_dir, max_bytes=10**9)
+        os.utime(data_path, (now - 100 * (age + 1), now - 100 * (age + 1)))
+    # Loading the oldest season marks it as the most recently used
+    load_cached_season(2018, cache_dir=cache_dir)
+    assert [entry['path'] for entry in season_cache_entries(cache_dir)][-1] == season_cache_paths(2018, cache_dir)[0]
+
+    size = season_cache_entries(cache_dir)[0]['size']
+    evicted = evict_season_cache(cache_dir, max_bytes=2 * size + size // 2)
+    assert evicted == [season_cache_paths(season, cache_dir)[0] for season in [2019, 2020]]
+    assert sorted(os.listdir(cache_dir)) == sorted(os.path.basename(path) for season in [2018, 2021]
+                                                   for path in season_cache_paths(season, cache_dir))
+
+    # Kept paths survive even when they are the least recently used
+    assert evict_season_cache(cache_dir, max_bytes=0, keep=[season_cache_paths(2021, cache_dir)[0]]) == \
+        [season_cache_paths(2018, cache_dir)[0]]
@@ -0,0 +1,29 @@
+import plotly.graph_objects as go
+import pytest
+from SWEEP.sweep_figure import FigureSpec, magic_underscores
+from SWEEP.sweep_main import run_sweep_viz
+
+
+@pytest.mark.parametrize('options', [{}, {'consolidate': True}, {'consolidate': True, 'hover': 'template'}])
+def test_fast_figure_matches_graph_objects(ot_game, options):
+    fast_fig = run_sweep_viz(*ot_game, fast=True, **options)
+    assert isinstance(fast_fig, FigureSpec)
+    assert fast_fig.to_json() == run_sweep_viz(*ot_game, **options).to_json()
+
+
+def test_magic_underscores_match_plotly():
+    figs = []
+    for fig in (FigureSpec(), go.Figure()):
+        fig.add_scatter(x=[1, 2], y=[3, 4], marker_color='red', error_y_thickness=2, line=dict(width=2),
+                        line_dash='dot', hoverlabel_font_size=10)
+        fig.update_layout(paper_bgcolor='white', xaxis_title_font_size=12, legend_title_text='Teams')
+        fig.update_xaxes(tickfont_size=9)
+        fig.add_annotation(x=1, y=3, text='TD', font_size=9)
+        figs.append(fig.to_json())
+    assert figs[0] == figs[1]
+
+
+def test_magic_underscores_reject_scalar_parent():
+    assert magic_underscores({'title': {'text': 'a'}, 'title_font_size': 9}) == {'title': {'text': 'a', 'font': {'size': 9}}}
+    with pytest.raises(ValueError):
+        magic_underscores({'title': 'a', 'title_font_size': 9})
@@ -0,0 +1,79 @@
+import re
+import numpy as np
+import pandas as pd
+from SWEEP.sweep_data import build_hover_text, create_hover_data, create_hover_text, hover_template
+from SWEEP.sweep_viz import kickoff_hover_text, turnover_hover_text
+
+
+def hover_plays():
+    """A few plays covering downs / no downs, excitement / none, short / long desc and missing text fields"""
+    return pd.DataFrame({
+        'qtr': [1, 2, 3, 4],
+        'time': ['15:00', np.nan, '07:12', '00:41'],
+        'down': [1.0, np.nan, 3.0, 2.0],
+        'ydstogo': [10.0, np.nan, 7.0, 4.0],
+        'yrdln': ['KC 25', 'BUF 40', np.nan, 'KC 10'],
+        'desc': ['run for 4 yards', 'kickoff', 'x' * 220, 'pass complete'],
+        'posteam': ['KC', 'BUF', np.nan, 'KC'],
+        'total_home_score': [0, 7, 14, 21],
+        'total_away_score': [0, 3, 3, 10],
+        'home_team': ['KC'] * 4,
+        'away_team': ['BUF'] * 4,
+        'yards_gained_display': [4.0, 0.0, -2.0, 12.0],
+        'play_excitement': [0.0, 2.25, 0.0, 13.4],
+    })
+
+
+def test_build_hover_text_matches_row_wise():
+    plays = hover_plays()
+    expected = plays.apply(create_hover_text, axis=1)
+    assert build_hover_text(plays).tolist() == expected.tolist()
+
+
+def test_build_hover_text_missing_fields_are_not_blank():
+    hover = build_hover_text(hover_plays())
+    assert hover.notna().all()
+    assert '<b>Q2 nan</b>' in hover[1]
+    assert '3 & 7 at nan' in hover[2]
+
+
+def test_build_hover_text_rows():
+    plays = hover_plays()
+    rows = pd.Series([True, False, True, False], index=plays.index)
+    hover = build_hover_text(plays, rows)
+    assert hover[~rows].isna().all()
+    assert hover[rows].tolist() == plays[rows].apply(create_hover_text, axis=1).tolist()
+
+
+def test_kickoff_and_turnover_hover_text_missing_fields():
+    plays = pd.DataFrame({
+        'qtr': [1, 3],
+        'time': ['15:00', np.nan],
+        'posteam': ['KC', np.nan],
+        'defteam': ['BUF', 'KC'],
+        'special_outcome': ['interception', 'fumble_lost'],
+        'desc': ['kicks 65 yards', 'y' * 150],
+    })
+    kickoffs = kickoff_hover_text(plays)
+    assert kickoffs.tolist() == [f"<b>KICKOFF - Q{row['qtr']} {row['time']}</b><br>{row['posteam']} kicks off<br>{row['desc']}"
+                                 for _, row in plays.iterrows()]
+    turnovers = turnover_hover_text(plays)
+    assert turnovers.tolist() == [f"<b>TURNOVER - Q{row['qtr']} {row['time']}</b><br>{row['posteam']} → {row['defteam']}<br>"
+                                  f"{row['special_outcome'].replace('_', ' ').title()}<br>{row['desc'][:100]}"
+                                  for _, row in plays.iterrows()]
+
+
+def fill_template(template, customdata):
+    """Fill a hovertemplate's %{customdata[i]} / %{customdata[i]:format} fields the way plotly does"""
+    def field(match):
+        value = customdata[int(match.group(1))]
+        return format(value, match.group(2)) if match.group(2) else str(value)
+    return re.sub(r'%\{customdata\[(\d+)\](?::([^}]*))?\}', field, template).replace('<extra></extra>', '')
+
+
+def test_hover_template_matches_hover_text():
+    plays = hover_plays()
+    template = hover_template('KC', 'BUF')
+    customdata = create_hover_data(plays).to_numpy(dtype=object)
+    filled = [fill_template(template, row) for row in customdata]
+    assert filled == build_hover_text(plays).tolist()
@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+import pytest
+from SWEEP.sweep_data import (filter_non_plays, flag_admin_events, is_admin_event, label_drives_firsts,
+                              ADMIN_EVENT_STRINGS)
+
+
+def admin_plays():
+    return pd.DataFrame({
+        'play_id': [1, 2, 3, 4, 5, 6],
+        'desc': ['run for 3 yards', 'Timeout #1 by KC at 02:00.', 'END QUARTER 1', 'pass incomplete',
+                 np.nan, 'END GAME'],
+    })
+
+
+def test_is_admin_event_matches_desc():
+    admin = is_admin_event(admin_plays())
+    assert admin.tolist() == [False, True, True, False, True, True]
+
+
+def test_filter_non_plays_with_load_time_flag():
+    plays = flag_admin_events(admin_plays())
+    # The flag is used as is when filtering with the default strings
+    plays.loc[0, 'is_admin_event'] = True
+    assert filter_non_plays(plays)['play_id'].tolist() == [4]
+
+
+def test_filter_non_plays_without_flag():
+    # No is_admin_event column: desc is matched on the fly, plays without a desc are dropped
+    assert filter_non_plays(admin_plays())['play_id'].tolist() == [1, 4]
+
+
+def test_filter_non_plays_custom_strings_ignore_flag():
+    plays = flag_admin_events(admin_plays())
+    kept = filter_non_plays(plays, ['imeout'])
+    assert kept['play_id'].tolist() == [1, 3, 4, 6]
+    assert list(ADMIN_EVENT_STRINGS) == ['imeout', 'END QUARTER', 'END GAME']
+
+
+def drive_plays(first_down_columns):
+    """Two games of three drives each; the second game's first drive number equals the first game's last"""
+    plays = pd.DataFrame({
+        'game_id': ['a'] * 6 + ['b'] * 4,
+        'drive': [1, 1, 1, 2, 2, 3, 3, 3, 4, 4],
+        'down': [1, 2, 1, np.nan, 1, 1, 1, 1, 1, 2],
+        'play_type': ['run', 'pass', 'run', 'kickoff', 'pass', 'run', 'run', 'pass', 'run', 'run'],
+    })
+    converted = [0, 1, 0, 0, 0, 1, 1, 0, 0, 0]
+    for column in first_down_columns:
+        plays[column] = converted
+    return plays
+
+
+@pytest.mark.parametrize('first_down_columns', [['first_down'], ['first_down_pass', 'first_down_rush']])
+def test_label_drives_firsts_first_down_columns(first_down_columns):
+    plays = label_drives_firsts(drive_plays(first_down_columns))
+    assert plays['is_drive_start'].tolist() == [True, False, False, False, True, True,
+                                                True, False, True, False]
+    # 1st downs right after a converting play, never carried over from the previous game
+    assert plays['is_first_down'].tolist() == [False, False, True, False, False, False,
+                                               False, True, False, False]
+
+
+def test_label_drives_firsts_without_first_down_columns():
+    plays = label_drives_firsts(drive_plays([]))
+    # 1st down following any other down of the same drive (plays without a down count as down 0)
+    assert plays['is_first_down'].tolist() == [False, False, True, False, True, False,
+                                               False, False, False, False]
@@ -0,0 +1,14 @@
+from SWEEP.sweep_main import render_games
+from season_fixture import fixture_season
+
+
+def test_render_games_shares_one_plotlyjs(tmp_path):
+    report = render_games(fixture_season(weeks=1), str(tmp_path), the_week=1, max_workers=2)
+    assert report['error'].isna().all()
+    html_files = sorted(tmp_path.glob('sweep_viz_*.html'))
+    assert len(html_files) == len(report)
+    assert (tmp_path / 'plotly.min.js').stat().st_size > 1_000_000
+    for path in html_files:
+        assert '<script charset="utf-8" src="plotly.min.js"></script>' in path.read_text()
+        assert path.stat().st_size < 500_000
+    assert not list(tmp_path.glob('*.tmp'))
@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+import pytest
+from SWEEP.sweep_data import calculate_excitement, get_catalog_game
+from SWEEP.sweep_main import make_sweep_data, make_sweep_season
+from season_fixture import fixture_season
+
+
+@pytest.fixture(scope='module')
+def two_games():
+    """
+    Two fixture games where the second starts without its opening kickoff and with no WP, possession
+    or down on its first play, so any shift or fill that crosses the game boundary changes the result
+    """
+    season_data = fixture_season(weeks=1)
+    first_id, second_id = season_data['game_id'].unique()[:2]
+    first = season_data[season_data['game_id'] == first_id]
+    second = season_data[season_data['game_id'] == second_id].iloc[1:].copy()
+    second.loc[second.index[0], ['wp', 'vegas_wp', 'posteam', 'defteam', 'down', 'ydstogo']] = np.nan
+    return pd.concat([first, second], ignore_index=True)
+
+
+@pytest.fixture(scope='module')
+def season_and_games(two_games):
+    season_plays, catalog = make_sweep_season(two_games)
+    per_game = []
+    for game_id in catalog.index:
+        game_plays, game_info = get_catalog_game(two_games, game_id, catalog)
+        per_game.append(make_sweep_data(game_plays.copy(), game_info)[0])
+    return season_plays, pd.concat(per_game)
+
+
+def test_make_sweep_season_matches_per_game(season_and_games):
+    season_plays, per_game = season_and_games
+    pd.testing.assert_frame_equal(season_plays, per_game)
+
+
+
+def game_boundary(season_plays):
+    """Last row of the first game and first row of the second"""
+    first_of_second = np.flatnonzero(season_plays['game_id'] != season_plays['game_id'].iloc[0])[0]
+    return season_plays.iloc[first_of_second - 1], season_plays.iloc[first_of_second]
+
+
+def test_make_sweep_season_shifts_stay_in_game(season_and_games):
+    last_of_first, first_of_second = game_boundary(season_and_games[0])
+    assert np.isnan(last_of_first['next_time_elapsed_min'])
+    assert first_of_second['time_elapsed_min'] < last_of_first['time_elapsed_min']
+
+
+def test_calculate_excitement_matches_per_game(season_and_games):
+    season_plays = season_and_games[0]
+    excitement_columns = ['vegas_wp_filled', 'posteam_filled', 'home_wp', 'home_wp_next', 'posteam_filled_next',
+                          'play_excitement', 'possession_changed', 'is_real_play', 'play_unpredictability']
+    inputs = season_plays.drop(columns=excitement_columns)
+    home_team = np.where(inputs['game_id'] == inputs['game_id'].iloc[0], *inputs['home_team'].unique()[:2])
+    season = calculate_excitement(inputs.copy(), home_team)
+    per_game = pd.concat([calculate_excitement(game_plays.copy(), game_plays['home_team'].iloc[0])
+                          for _, game_plays in inputs.groupby('game_id', sort=False)])
+    pd.testing.assert_frame_equal(season[excitement_columns], per_game[excitement_columns])
+
+    # The second game's first play has no WP or possession: its WP is not filled from the first game,
+    # its possession is back-filled from its own next play, and the first game's last play has no next WP
+    last_of_first, first_of_second = game_boundary(season)
+    assert np.isnan(first_of_second['home_wp'])
+    assert first_of_second['posteam_filled'] == season['posteam'].iloc[season.index.get_loc(first_of_second.name) + 1]
+    assert np.isnan(last_of_first['home_wp_next'])
+    assert last_of_first['play_excitement'] == 0
@@ -0,0 +1,33 @@
+import numpy as np
+import pytest
+from SWEEP import sweep_store
+from SWEEP.sweep_data import game_catalog, get_catalog_game
+from SWEEP.sweep_main import make_sweep_data, run_sweep_viz
+from SWEEP.sweep_store import materialize_season, stored_sweep_viz
+from season_fixture import fixture_season
+
+
+@pytest.mark.parametrize('season', [2021, np.int64(2021)])
+def test_materialize_season_failed_download(monkeypatch, tmp_path, capsys, season):
+    requested = []
+    monkeypatch.setattr(sweep_store, 'download_nfl_data_season', lambda season: requested.append(season))
+    report = materialize_season(season, store_dir=str(tmp_path))
+    assert requested == [2021]
+    assert report.empty
+    assert '✗ Could not load the 2021 season' in capsys.readouterr().out
+    assert not any(tmp_path.iterdir())
+
+
+def test_materialized_games_render_like_run_sweep_viz(tmp_path):
+    season_data = fixture_season(weeks=1)
+    report = materialize_season(season_data, store_dir=str(tmp_path), max_workers=2)
+    assert report['stored'].all() and report['error'].isna().all()
+    assert materialize_season(season_data, store_dir=str(tmp_path), max_workers=2)['skipped'].all()
+
+    catalog = game_catalog(season_data)
+    for game_id in catalog.index:
+        game_plays, game_info = get_catalog_game(season_data, game_id, catalog)
+        game_plays, home_team, away_team = make_sweep_data(game_plays.copy(), game_info, 'plotted')[:3]
+        for options in [{}, {'consolidate': True, 'fast': True, 'hover': 'template'}]:
+            stored = stored_sweep_viz(game_id, store_dir=str(tmp_path), **options)
+            assert stored.to_json() == run_sweep_viz(game_plays, home_team, away_team, **options).to_json()
@@ -0,0 +1,37 @@
+import numpy as np
+import pandas as pd
+import pytest
+from SWEEP.sweep_data import calculate_time_elapsed, compute_time_elapsed
+
+
+def clock_plays():
+    """Regulation and OT plays hitting every branch: game clock, quarter clock, quarter only, no quarter"""
+    return pd.DataFrame({
+        'qtr': [1, 2, 4, 4, 3, 5, 5, 6, 5, 6, np.nan],
+        'game_seconds_remaining': [3600, 2000, 30, np.nan, -5, np.nan, 100, np.nan, np.nan, np.nan, 1000],
+        'quarter_seconds_remaining': [900, 200, 30, 120, 450, 600, 300, 450, np.nan, np.nan, 100],
+    })
+
+
+@pytest.mark.parametrize('ot_length', [600, 900, 10, 15])
+def test_compute_time_elapsed_matches_row_wise(ot_length):
+    plays = clock_plays()
+    expected = plays.apply(calculate_time_elapsed, axis=1, ot_length=ot_length).to_numpy(dtype=float)
+    np.testing.assert_array_equal(compute_time_elapsed(plays, ot_length), expected)
+
+
+def test_compute_time_elapsed_per_row_ot_length():
+    plays = clock_plays()
+    ot_length = np.where(np.arange(len(plays)) % 2 == 0, 600, 900)
+    expected = [calculate_time_elapsed(row, ot) for (_, row), ot in zip(plays.iterrows(), ot_length)]
+    np.testing.assert_array_equal(compute_time_elapsed(plays, ot_length), np.asarray(expected, dtype=float))
+
+
+def test_overtime_period_lengths():
+    plays = pd.DataFrame({'qtr': [5, 6], 'game_seconds_remaining': [np.nan, np.nan],
+                          'quarter_seconds_remaining': [300, 300]})
+    # Regular season: 10 minute OT periods, in seconds (as get_game_info gives it) or minutes
+    np.testing.assert_array_equal(compute_time_elapsed(plays, 600), [3900, 4500])
+    np.testing.assert_array_equal(compute_time_elapsed(plays, 10), [3900, 4500])
+    # Playoffs: 15 minute OT periods
+    np.testing.assert_array_equal(compute_time_elapsed(plays, 900), [4200, 5100])
@@ -0,0 +1,115 @@
+import json
+from collections import Counter
+import numpy as np
+import pytest
+from SWEEP.sweep_figure import FigureSpec
+from SWEEP.sweep_main import run_sweep_viz
+from SWEEP.sweep_viz import add_field_lines, add_kicks, build_render_context
+
+
+def drawn_points(trace, *text_keys):
+    """(x, y, hover) of each drawn point of a trace, skipping the None / NaN gaps between merged segments"""
+    texts = next((trace[key] for key in text_keys if key in trace), None)
+    points = []
+    for i, (x, y) in enumerate(zip(trace['x'], trace['y'])):
+        if x is None or (isinstance(x, float) and np.isnan(x)):
+            points.append(None)
+        else:
+            text = texts if texts is None or isinstance(texts, str) else texts[i]
+            if isinstance(text, (list, np.ndarray)):
+                text = tuple(np.asarray(text).tolist())
+            points.append((float(x), float(y), text))
+    return points
+
+
+def marker_points(fig):
+    """Counter of every plotted marker: legend group, trace name, marker style and point"""
+    points = Counter()
+    for trace in fig.to_plotly_json()['data']:
+        if 'markers' in trace.get('mode', ''):
+            style = (json.dumps(trace.get('marker'), sort_keys=True), trace.get('hovertemplate'))
+            points.update((trace.get('legendgroup'), trace.get('name'), style, point)
+                          for point in drawn_points(trace, 'hovertext', 'text', 'customdata') if point is not None)
+    return points
+
+
+def line_segments(fig, legendgroups=None):
+    """Counter of every drawn line segment: legend group, line style, opacity and its points"""
+    segments = Counter()
+    for trace in fig.to_plotly_json()['data']:
+        if trace.get('mode') != 'lines' or (legendgroups and trace.get('legendgroup') not in legendgroups):
+            continue
+        style = (trace.get('legendgroup'), json.dumps(trace.get('line'), sort_keys=True), trace.get('opacity'),
+                 trace.get('hovertemplate', trace.get('hoverinfo')))
+        segment = []
+        for point in drawn_points(trace, 'hovertext', 'text', 'customdata') + [None]:
+            if point is None:
+                if segment:
+                    segments[(*style, tuple(segment))] += 1
+                segment = []
+            else:
+                segment.append(point)
+    return segments
+
+
+def legend_entries(fig):
+    return sorted((trace.get('legendgroup') or '', trace.get('name') or '')
+                  for trace in fig.to_plotly_json()['data'] if trace.get('showlegend', True))
+
+
+@pytest.mark.parametrize('hover', ['text', 'template'])
+def test_consolidated_team_plays_match_per_play_traces(ot_game, hover):
+    game_plays, home_team, away_team = ot_game
+    per_play = run_sweep_viz(*ot_game, fast=True, hover=hover)
+    consolidated = run_sweep_viz(*ot_game, fast=True, consolidate=True, hover=hover)
+    assert len(consolidated.data) < len(per_play.data)
+
+    points = marker_points(per_play)
+    assert sum(points.values()) > len(game_plays)
+    assert marker_points(consolidated) == points
+    team_groups = {trace.get('legendgroup') for trace in per_play.data
+                   if str(trace.get('legendgroup')).startswith((home_team, away_team))}
+    drive_lines = line_segments(per_play, team_groups)
+    assert sum(drive_lines.values()) > 0
+    assert line_segments(consolidated, team_groups) == drive_lines
+    assert legend_entries(consolidated) == legend_entries(per_play)
+
+
+def legend_traces(fig, legendgroups):
+    """Name, line style and legend rank of the legend entries of some legend groups"""
+    return sorted((trace['legendgroup'], trace['name'], json.dumps(trace.get('line'), sort_keys=True),
+                   trace.get('legendrank')) for trace in fig.to_plotly_json()['data']
+                  if trace.get('legendgroup') in legendgroups and trace.get('showlegend', True))
+
+
+@pytest.mark.parametrize('hover', ['text', 'template'])
+def test_consolidated_field_lines_match_per_line_traces(ot_game, hover):
+    field_groups = {'kickoffs', 'turnovers'}
+    per_play = run_sweep_viz(*ot_game, fast=True, hover=hover)
+    consolidated = run_sweep_viz(*ot_game, fast=True, consolidate=True, hover=hover)
+    field_lines = line_segments(per_play, field_groups)
+    assert {segment[0] for segment in field_lines} == field_groups
+    assert line_segments(consolidated, field_groups) == field_lines
+    assert legend_traces(consolidated, field_groups) == legend_traces(per_play, field_groups)
+
+
+def test_add_field_lines_merges_lines_into_one_trace():
+    line = dict(color='purple', width=1.5, dash='dash')
+    figs = [add_field_lines(FigureSpec(), [0.0, 12.5, 61.25], ['a', 'b', 'c'], 'Kickoffs', line, 'kickoffs', 0.4, 550,
+                            consolidate=consolidate) for consolidate in (False, True)]
+    assert [len(fig.data) for fig in figs] == [4, 1]
+    assert line_segments(figs[1]) == line_segments(figs[0])
+    assert sum(line_segments(figs[1]).values()) == 3
+    assert legend_traces(figs[1], {'kickoffs'}) == legend_traces(figs[0], {'kickoffs'})
+
+
+def test_render_context_builds_only_what_is_read(ot_game):
+    game_plays = ot_game[0]
+    context = build_render_context(game_plays)
+    add_kicks(FigureSpec(), game_plays, context=context)
+    assert 'kickoffs' in context
+    assert not {'team_plays', 'outcomes', 'extra_points', 'game_summary'} & context.keys()
+    # Each entry is built once and then reused
+    team_plays = context['team_plays']
+    assert context['team_plays'] is team_plays
+    assert sum(map(len, team_plays.values())) == (context['valid_plays']['down'] > 0).sum()